@@ -1,22 +1,163 @@
 import asyncio
+import functools
+import hashlib
+import importlib.util
 import json
+import logging
 import os
-from collections.abc import Callable
-from dataclasses import dataclass
+import reprlib
+import sys
+import time
+import weakref
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Mapping
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, replace
 from enum import Enum
 from pathlib import Path
-from typing import Any
+from types import MappingProxyType
+from typing import Any, ClassVar, cast
 
+import httpx
 import yaml
 from dotenv import load_dotenv
 from openai import AsyncOpenAI
+from openai.types.chat import ChatCompletionMessageParam
 from rich.console import Console
 from rich.panel import Panel
 from rich.table import Table
 
+from utils.serialization import json_dumps, json_loads
+
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:  # libyaml bindings not available
+    from yaml import SafeLoader  # type: ignore[assignment]
+
 load_dotenv()
 
 console = Console()
+logger = logging.getLogger(__name__)
+
+PROMPTS_PATH = Path(__file__).parent.parent / "config" / "prompts.yaml"
+
+# h2 comes with the httpx[http2] dependency; fall back to HTTP/1.1 without it
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+# Process-wide LRU of LLM responses, keyed by a hash of the full request
+RESPONSE_CACHE_SIZE = 256
+_response_cache: OrderedDict[str, dict[str, Any]] = OrderedDict()
+
+# Seconds between status checks while waiting for a Batch API job
+BATCH_POLL_INTERVAL = 30.0
+_BATCH_FINAL_STATUSES = frozenset({"completed", "failed", "expired", "cancelled"})
+
+
+# reprlib stops descending once its limits are hit, so previewing a large tool
+# output does not materialize its full string form
+_preview_repr = reprlib.Repr()
+_preview_repr.maxstring = 100
+_preview_repr.maxother = 100
+
+
+def _shortrepr(obj: Any, limit: int = 100) -> str:
+    """Return a preview of obj at most about ``limit`` characters long."""
+    text = _preview_repr.repr(obj)
+    return text if len(text) <= limit else text[:limit] + "..."
+
+
+class _TokenBucket:
+    """Async token bucket refilling ``capacity`` tokens every ``period`` seconds."""
+
+    def __init__(self, capacity: float, period: float = 60.0):
+        self.capacity = capacity
+        self._rate = capacity / period
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, amount: float = 1.0) -> None:
+        """Wait until ``amount`` tokens are available and take them."""
+        # A request larger than the bucket could otherwise never proceed
+        amount = min(amount, self.capacity)
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.capacity, self._tokens + (now - self._updated) * self._rate
+                )
+                self._updated = now
+                if self._tokens >= amount:
+                    self._tokens -= amount
+                    return
+                await asyncio.sleep((amount - self._tokens) / self._rate)
+
+
+# Rate limits apply to the account rather than to one agent, so every agent on
+# the same client draws from one bucket per (limit, model, capacity)
+_rate_limiters: weakref.WeakKeyDictionary[
+    AsyncOpenAI, dict[tuple[str, str, float], _TokenBucket]
+] = weakref.WeakKeyDictionary()
+
+
+def _shared_token_bucket(
+    client: AsyncOpenAI, limit: str, model: str, capacity: float
+) -> _TokenBucket:
+    """Return the bucket shared by agents using this client and model."""
+    buckets = _rate_limiters.setdefault(client, {})
+    key = (limit, model, capacity)
+    bucket = buckets.get(key)
+    if bucket is None:
+        bucket = buckets[key] = _TokenBucket(capacity)
+    return bucket
+
+
+# Tool concurrency caps shared by every agent in an event loop, keyed by the
+# cap; semaphores cannot be shared across loops
+_tool_semaphores: weakref.WeakKeyDictionary[
+    asyncio.AbstractEventLoop, dict[int, asyncio.Semaphore]
+] = weakref.WeakKeyDictionary()
+
+
+def _shared_tool_semaphore(limit: int) -> asyncio.Semaphore:
+    """Return the semaphore capping concurrent tool calls across agents."""
+    semaphores = _tool_semaphores.setdefault(asyncio.get_running_loop(), {})
+    semaphore = semaphores.get(limit)
+    if semaphore is None:
+        semaphore = semaphores[limit] = asyncio.Semaphore(limit)
+    return semaphore
+
+
+def _estimate_tokens(messages: list[dict[str, Any]], max_tokens: int) -> int:
+    """Roughly estimate the tokens a request counts against the TPM limit."""
+    chars = 0
+    for message in messages:
+        chars += len(message.get("content") or "")
+        for tool_call in message.get("tool_calls") or []:
+            chars += len(tool_call["function"]["arguments"])
+    # ~4 characters per token, plus the completion budget OpenAI reserves
+    return chars // 4 + max_tokens
+
+
+def _create_http_client(
+    max_connections: int, max_keepalive: int, timeout: float
+) -> httpx.AsyncClient:
+    """Create a pooled httpx client, multiplexing over HTTP/2 when available."""
+    return httpx.AsyncClient(
+        http2=HTTP2_AVAILABLE,
+        limits=httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive,
+        ),
+        timeout=httpx.Timeout(timeout, connect=10.0),
+    )
+
+
+@functools.lru_cache(maxsize=1)
+def _load_prompts(path: str) -> Mapping[str, Any]:
+    """Load the prompts file once and share a read-only view across agents."""
+    with open(path) as f:
+        return MappingProxyType(yaml.load(f, Loader=SafeLoader))
 
 
 class ModelProvider(Enum):
@@ -30,6 +171,28 @@ class AgentConfig:
     temperature: float = 0.7
     max_tokens: int = 4000
     max_iterations: int = 10
+    # HTTP connection pool used by the default OpenAI client
+    max_connections: int = 2000
+    max_keepalive_connections: int = 1500
+    # Client-side rate limits (requests / tokens per minute), shared by all
+    # agents on the same client and model; None disables
+    rpm: int | None = None
+    tpm: int | None = None
+    cache_responses: bool = False  # Reuse responses for identical requests
+    # Share one execution between identical tool calls in an iteration
+    # (only safe when tools have no side effects)
+    dedup_tool_calls: bool = False
+    # Cap on tool functions running at once across all agents in the process,
+    # keeping external APIs within their rate limits; None disables
+    max_tool_concurrency: int | None = 8
+    # Let the model request several tools in one turn; they run concurrently
+    parallel_tool_calls: bool = True
+    # Send non-interactive planning requests through the OpenAI Batch API
+    use_batch_api: bool = False
+    # Persist finished meal plans on disk and reuse them for identical requests
+    cache_meal_plans: bool = False
+    # Rich progress output; off by default when stdout is not a terminal
+    verbose: bool = field(default_factory=lambda: sys.stdout.isatty())
 
 
 @dataclass
@@ -46,24 +209,146 @@ class ToolResult:
     error: str | None = None
 
 
+@dataclass(slots=True)
+class _ToolEntry:
+    """A registered tool with its argument checks precomputed."""
+
+    function: Callable[..., Any]
+    description: str
+    parameters: dict[str, Any]
+    required: frozenset[str]
+    # None when the schema does not enumerate its properties
+    allowed: frozenset[str] | None
+    is_coroutine: bool
+
+    @classmethod
+    def create(
+        cls, func: Callable[..., Any], description: str, parameters: dict[str, Any]
+    ) -> "_ToolEntry":
+        properties = parameters.get("properties")
+        return cls(
+            function=func,
+            description=description,
+            parameters=parameters,
+            required=frozenset(parameters.get("required", ())),
+            allowed=frozenset(properties) if properties is not None else None,
+            is_coroutine=asyncio.iscoroutinefunction(func),
+        )
+
+    def validate(self, arguments: dict[str, Any]) -> None:
+        """Reject arguments that do not match the schema's property names."""
+        missing = self.required.difference(arguments)
+        if missing:
+            raise ValueError(f"Missing required arguments: {sorted(missing)}")
+        if self.allowed is not None:
+            unexpected = set(arguments).difference(self.allowed)
+            if unexpected:
+                raise ValueError(f"Unexpected arguments: {sorted(unexpected)}")
+
+
+class FatalToolError(Exception):
+    """Raised by a tool when the run cannot usefully continue.
+
+    Other tool exceptions are reported back to the LLM as error results; this
+    one cancels the remaining tool calls of the iteration and aborts the run.
+    """
+
+
+ToolCallCallback = Callable[[ToolCall], None]
+
+
+@dataclass
+class RunState:
+    """Per-conversation state, kept off the agent so runs can share one agent."""
+
+    messages: list[dict[str, Any]]
+    iteration: int = 0
+    # Tool calls already started in the current iteration, by id and, when
+    # deduplication is enabled, by (name, arguments)
+    started_tools: dict[str, asyncio.Task[ToolResult]] = field(default_factory=dict)
+    deduped_tools: dict[str, asyncio.Task[ToolResult]] = field(default_factory=dict)
+
+
 class BaseAgent:
-    def __init__(self, config: AgentConfig):
+    # Format the model's final answer must follow (an OpenAI response_format
+    # payload); subclasses with a fixed output schema override this
+    response_format: ClassVar[dict[str, Any] | None] = None
+
+    def __init__(self, config: AgentConfig, client: AsyncOpenAI | None = None):
         self.config = config
-        self.tools: dict[str, dict[str, Any]] = {}
+        self.tools: dict[str, _ToolEntry] = {}
+        self._openai_tools_cache: list[dict[str, Any]] | None = None
+        # Request function with everything but the messages bound; see
+        # _build_openai_request
+        self._send_openai_request: (
+            Callable[[list[dict[str, Any]]], Awaitable[Any]] | None
+        ) = None
+        # Runs synchronous tools off the event loop for the agent's lifetime
+        self._executor = ThreadPoolExecutor(
+            max_workers=32, thread_name_prefix="agent-tool"
+        )
+        # History of the most recent run() call
         self.messages: list[dict[str, Any]] = []
-        self.iteration_count = 0
 
-        # Load prompts
-        prompts_path = Path(__file__).parent.parent / "config" / "prompts.yaml"
-        with open(prompts_path) as f:
-            self.prompts = yaml.safe_load(f)
+        # Load prompts (parsed once per process)
+        self.prompts = _load_prompts(str(PROMPTS_PATH))
+        # Shared by every conversation; never mutated after construction
+        self._system_message: dict[str, Any] = {
+            "role": "system",
+            "content": self.prompts["system_prompt"],
+        }
 
-        # Initialize LLM client
+        # Initialize LLM client; injected clients are owned by the caller
+        self._owns_client = client is None
         if config.model_provider == ModelProvider.OPENAI:
-            self.client: AsyncOpenAI = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+            self.client: AsyncOpenAI = client or AsyncOpenAI(
+                api_key=os.getenv("OPENAI_API_KEY"),
+                http_client=_create_http_client(
+                    config.max_connections,
+                    config.max_keepalive_connections,
+                    timeout=120.0,
+                ),
+            )
+            self._llm_call: Callable[
+                [RunState, ToolCallCallback | None],
+                Awaitable[dict[str, Any]],
+            ] = self._get_openai_response
         else:
             raise ValueError(f"Unsupported model provider: {config.model_provider}")
 
+        # Throttle requests before they are sent rather than backing off on 429s
+        self._rpm_limiter = (
+            _shared_token_bucket(self.client, "rpm", config.model_name, config.rpm)
+            if config.rpm
+            else None
+        )
+        self._tpm_limiter = (
+            _shared_token_bucket(self.client, "tpm", config.model_name, config.tpm)
+            if config.tpm
+            else None
+        )
+
+    @classmethod
+    def create_shared_client(
+        cls,
+        max_connections: int = 2000,
+        max_keepalive: int = 1500,
+        timeout: float = 120.0,
+    ) -> AsyncOpenAI:
+        """Create an OpenAI client with a connection pool sized for fan-out.
+
+        Pass the result to several agents (or use run_many) so that concurrent
+        conversations share one pool instead of each opening their own.
+        """
+        http_client = _create_http_client(max_connections, max_keepalive, timeout)
+        return AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"), http_client=http_client)
+
+    async def aclose(self) -> None:
+        """Release the tool thread pool and the HTTP client if this agent created it."""
+        self._executor.shutdown(wait=False)
+        if self._owns_client:
+            await self.client.close()
+
     def register_tool(
         self,
         name: str,
@@ -72,125 +357,310 @@ class BaseAgent:
         parameters: dict[str, Any],
     ) -> None:
         """Register a tool that the agent can use."""
-        self.tools[name] = {
-            "function": func,
-            "description": description,
-            "parameters": parameters,
-        }
+        self.tools[name] = _ToolEntry.create(func, description, parameters)
+        self._openai_tools_cache = None
+        self._send_openai_request = None
 
     def format_tools_for_openai(self) -> list[dict[str, Any]]:
-        """Format tools for OpenAI API."""
+        """Format tools for OpenAI API (built once, rebuilt after registration)."""
+        if self._openai_tools_cache is not None:
+            return self._openai_tools_cache
+
         tools = []
-        for name, tool_info in self.tools.items():
+        for name, entry in self.tools.items():
             tools.append(
                 {
                     "type": "function",
                     "function": {
                         "name": name,
-                        "description": tool_info["description"],
-                        "parameters": tool_info["parameters"],
+                        "description": entry.description,
+                        "parameters": entry.parameters,
                     },
                 }
             )
+        self._openai_tools_cache = tools
         return tools
 
-    async def _get_llm_response(self) -> dict[str, Any]:
+    async def _get_llm_response(
+        self, state: RunState, on_tool_call: ToolCallCallback | None = None
+    ) -> dict[str, Any]:
         """Get response from LLM with tool calling support."""
-        if self.config.model_provider == ModelProvider.OPENAI:
-            return await self._get_openai_response()
-        else:
-            raise ValueError(
-                f"Unsupported model provider: {self.config.model_provider}"
-            )
-
-    async def _get_openai_response(self) -> dict[str, Any]:
-        """Get response from OpenAI."""
+        if not self.config.cache_responses:
+            # Provider was resolved in __init__, so no per-iteration dispatch here
+            return await self._llm_call(state, on_tool_call)
+
+        key = self._response_cache_key(state.messages)
+        cached = _response_cache.get(key)
+        if cached is not None:
+            _response_cache.move_to_end(key)
+            return cached
+
+        response = await self._llm_call(state, on_tool_call)
+        _response_cache[key] = response
+        if len(_response_cache) > RESPONSE_CACHE_SIZE:
+            _response_cache.popitem(last=False)
+        return response
+
+    def _response_cache_key(self, messages: list[dict[str, Any]]) -> str:
+        """Hash everything that determines the LLM response for this request."""
+        payload = json_dumps(
+            [
+                self.config.model_provider.value,
+                self.config.model_name,
+                self.config.temperature,
+                self.config.max_tokens,
+                self.config.parallel_tool_calls,
+                messages,
+                self.format_tools_for_openai(),
+                self.response_format,
+            ],
+            sort_keys=True,
+        )
+        return hashlib.blake2b(payload.encode()).hexdigest()
+
+    async def _get_openai_response(
+        self, state: RunState, on_tool_call: ToolCallCallback | None = None
+    ) -> dict[str, Any]:
+        """Stream a response from OpenAI.
+
+        Tool calls arrive in index order, so each one is complete as soon as the
+        next one starts. ``on_tool_call`` is invoked at that point, letting the
+        caller start the tool while the rest of the response is still streaming.
+        """
         try:
-            assert isinstance(self.client, AsyncOpenAI)
-            response = await self.client.chat.completions.create(  # type: ignore[call-overload]
-                model=self.config.model_name,
-                messages=self.messages,
-                tools=self.format_tools_for_openai(),
-                tool_choice="auto",
-                temperature=self.config.temperature,
-                max_tokens=self.config.max_tokens,
-            )
+            await self._throttle(state.messages)
 
-            message = response.choices[0].message
-
-            # Handle tool calls
-            if message.tool_calls:
-                tool_calls = []
-                for tc in message.tool_calls:
-                    tool_calls.append(
-                        ToolCall(
-                            name=tc.function.name,
-                            arguments=json.loads(tc.function.arguments),
-                            id=tc.id,
+            send = self._send_openai_request or self._build_openai_request()
+            stream = await send(state.messages)
+
+            content_parts: list[str] = []
+            raw_tool_calls: list[dict[str, Any]] = []
+            tool_calls: list[ToolCall] = []
+
+            def complete_tool_call(raw: dict[str, Any]) -> None:
+                tool_call = ToolCall(
+                    name=raw["function"]["name"],
+                    arguments=json_loads(raw["function"]["arguments"]),
+                    id=raw["id"],
+                )
+                tool_calls.append(tool_call)
+                if on_tool_call is not None:
+                    on_tool_call(tool_call)
+
+            async for chunk in stream:
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta
+
+                if delta.content:
+                    content_parts.append(delta.content)
+
+                for tc_delta in delta.tool_calls or []:
+                    if tc_delta.index >= len(raw_tool_calls):
+                        # A new index means the previous tool call is complete
+                        if raw_tool_calls:
+                            complete_tool_call(raw_tool_calls[-1])
+                        raw_tool_calls.append(
+                            {
+                                "id": "",
+                                "type": "function",
+                                "function": {"name": "", "arguments": ""},
+                            }
                         )
-                    )
-                return {
-                    "content": message.content,
-                    "tool_calls": tool_calls,
-                    "raw_message": message.model_dump(),
-                }
-            else:
-                return {
-                    "content": message.content,
-                    "tool_calls": None,
-                    "raw_message": message.model_dump(),
-                }
+                    raw = raw_tool_calls[tc_delta.index]
+                    if tc_delta.id:
+                        raw["id"] = tc_delta.id
+                    if tc_delta.function:
+                        if tc_delta.function.name:
+                            raw["function"]["name"] += tc_delta.function.name
+                        if tc_delta.function.arguments:
+                            raw["function"]["arguments"] += tc_delta.function.arguments
+
+            if raw_tool_calls:
+                complete_tool_call(raw_tool_calls[-1])
+
+            content = "".join(content_parts) if content_parts else None
+            raw_message: dict[str, Any] = {"role": "assistant", "content": content}
+            if raw_tool_calls:
+                raw_message["tool_calls"] = raw_tool_calls
+
+            return {
+                "content": content,
+                "tool_calls": tool_calls or None,
+                "raw_message": raw_message,
+            }
 
         except Exception as e:
-            console.print(f"[red]Error getting OpenAI response: {e}[/red]")
+            logger.error("Error getting OpenAI response: %s", e)
             raise
 
-    async def _execute_tool_calls(self, tool_calls: list[ToolCall]) -> list[ToolResult]:
-        """Execute tool calls in parallel."""
-        tasks = []
-        for tool_call in tool_calls:
+    def _build_openai_request(
+        self,
+    ) -> Callable[[list[dict[str, Any]]], Awaitable[Any]]:
+        """Bind the per-agent request arguments so each call only adds messages.
+
+        The result is cached until the next register_tool(); call this again
+        after changing the model or sampling settings on ``self.config``.
+        """
+        assert isinstance(self.client, AsyncOpenAI)
+        create = self.client.chat.completions.create
+        tools = self.format_tools_for_openai()
+        request_kwargs: dict[str, Any] = {
+            "model": self.config.model_name,
+            "tools": tools,
+            "tool_choice": "auto",
+            "temperature": self.config.temperature,
+            "max_tokens": self.config.max_tokens,
+            "stream": True,
+        }
+        # The API rejects this flag on requests without tools
+        if tools:
+            request_kwargs["parallel_tool_calls"] = self.config.parallel_tool_calls
+        if self.response_format is not None:
+            request_kwargs["response_format"] = self.response_format
+
+        def send(messages: list[dict[str, Any]]) -> Awaitable[Any]:
+            return create(
+                messages=cast(list[ChatCompletionMessageParam], messages),
+                **request_kwargs,
+            )
+
+        self._send_openai_request = send
+        return send
+
+    async def _throttle(self, messages: list[dict[str, Any]]) -> None:
+        """Wait until the configured RPM/TPM budgets allow another request."""
+        if self._rpm_limiter is not None:
+            await self._rpm_limiter.acquire()
+        if self._tpm_limiter is not None:
+            await self._tpm_limiter.acquire(
+                _estimate_tokens(messages, self.config.max_tokens)
+            )
+
+    def _start_tool_call(
+        self, tool_group: asyncio.TaskGroup, state: RunState, tool_call: ToolCall
+    ) -> None:
+        """Start executing a tool call as soon as it has been fully streamed."""
+        if tool_call.name in self.tools:
+            self._get_tool_task(tool_group, state, tool_call)
+
+    def _get_tool_task(
+        self, tool_group: asyncio.TaskGroup, state: RunState, tool_call: ToolCall
+    ) -> asyncio.Task[ToolResult]:
+        """Return the task executing a tool call, starting it if needed."""
+        task = state.started_tools.get(tool_call.id)
+        if task is not None:
+            return task
+
+        dedup_key = None
+        if self.config.dedup_tool_calls:
+            dedup_key = json_dumps(
+                [tool_call.name, tool_call.arguments], sort_keys=True
+            )
+            task = state.deduped_tools.get(dedup_key)
+
+        if task is None:
+            task = tool_group.create_task(self._execute_single_tool(tool_call))
+            if dedup_key is not None:
+                state.deduped_tools[dedup_key] = task
+
+        state.started_tools[tool_call.id] = task
+        return task
+
+    async def _execute_tool_calls(
+        self,
+        state: RunState,
+        tool_group: asyncio.TaskGroup,
+        tool_calls: list[ToolCall],
+    ) -> list[ToolResult]:
+        """Execute tool calls in parallel, reusing any already started.
+
+        All calls run in the iteration's task group, so a FatalToolError from
+        one of them cancels the others.
+        """
+        if len(tool_calls) == 1:
+            # Common case: nothing to run alongside, so skip gather, and the
+            # task too unless the call already started while streaming
+            tool_call = tool_calls[0]
             if tool_call.name not in self.tools:
-                tasks.append(
-                    self._create_error_result(
-                        tool_call.id, f"Unknown tool: {tool_call.name}"
-                    )
-                )
+                return [self._unknown_tool_result(tool_call)]
+            task = state.started_tools.get(tool_call.id)
+            if task is not None:
+                return [await task]
+            return [await self._execute_single_tool(tool_call)]
+
+        results: list[ToolResult | None] = []
+        pending: list[tuple[int, asyncio.Task[ToolResult]]] = []
+        for index, tool_call in enumerate(tool_calls):
+            if tool_call.name not in self.tools:
+                # Nothing to run, so don't schedule a task just to return this
+                results.append(self._unknown_tool_result(tool_call))
             else:
-                tasks.append(self._execute_single_tool(tool_call))
+                results.append(None)
+                pending.append(
+                    (index, self._get_tool_task(tool_group, state, tool_call))
+                )
 
-        results = await asyncio.gather(*tasks)
-        return results
+        completed = await asyncio.gather(*(task for _, task in pending))
+        for (index, _), result in zip(pending, completed, strict=True):
+            tool_call_id = tool_calls[index].id
+            # Deduplicated calls share a result; give each its own tool_call_id
+            if result.tool_call_id != tool_call_id:
+                result = replace(result, tool_call_id=tool_call_id)
+            results[index] = result
+
+        return [result for result in results if result is not None]
+
+    @staticmethod
+    def _unknown_tool_result(tool_call: ToolCall) -> ToolResult:
+        """Create the error result for a call to an unregistered tool."""
+        return ToolResult(
+            tool_call_id=tool_call.id,
+            output=None,
+            error=f"Unknown tool: {tool_call.name}",
+        )
 
     async def _execute_single_tool(self, tool_call: ToolCall) -> ToolResult:
         """Execute a single tool call."""
         try:
-            tool_func = self.tools[tool_call.name]["function"]
+            entry = self.tools[tool_call.name]
+            entry.validate(tool_call.arguments)
 
-            # Check if the function is async
-            if asyncio.iscoroutinefunction(tool_func):
-                result = await tool_func(**tool_call.arguments)
+            if not self.config.max_tool_concurrency:
+                result = await self._invoke_tool(entry, tool_call.arguments)
             else:
-                # For sync functions, run them directly
-                result = tool_func(**tool_call.arguments)
+                async with _shared_tool_semaphore(self.config.max_tool_concurrency):
+                    result = await self._invoke_tool(entry, tool_call.arguments)
 
             return ToolResult(tool_call_id=tool_call.id, output=result)
+        except FatalToolError:
+            raise
         except Exception as e:
             return ToolResult(tool_call_id=tool_call.id, output=None, error=str(e))
 
-    async def _create_error_result(self, tool_call_id: str, error: str) -> ToolResult:
-        """Create an error result for a tool call."""
-        return ToolResult(tool_call_id=tool_call_id, output=None, error=error)
-
-    def _add_tool_results_to_messages(self, tool_results: list[ToolResult]) -> None:
+    async def _invoke_tool(self, entry: _ToolEntry, arguments: dict[str, Any]) -> Any:
+        """Call a tool function, dispatching sync tools to the executor."""
+        if entry.is_coroutine:
+            return await entry.function(**arguments)
+        # Sync tools may block, so keep them off the event loop
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor, functools.partial(entry.function, **arguments)
+        )
+
+    def _add_tool_results_to_messages(
+        self, state: RunState, tool_results: list[ToolResult]
+    ) -> None:
         """Add tool results to message history."""
         if self.config.model_provider == ModelProvider.OPENAI:
             for result in tool_results:
                 if result.error:
                     content = f"Error: {result.error}"
                 else:
-                    content = json.dumps(result.output)
+                    # Sorted keys keep the history byte-stable for server-side
+                    # prompt prefix caching
+                    content = json_dumps(result.output, sort_keys=True)
 
-                self.messages.append(
+                state.messages.append(
                     {
                         "role": "tool",
                         "tool_call_id": result.tool_call_id,
@@ -221,51 +691,168 @@ class BaseAgent:
 
         for result in results:
             status = "✓ Success" if not result.error else "✗ Error"
-            output = (
-                str(result.output)[:100] + "..." if not result.error else result.error
-            )
+            output = _shortrepr(result.output) if not result.error else result.error
             table.add_row(result.tool_call_id[:8], status, output)
 
         console.print(table)
 
     async def run(self, user_input: str) -> str:
         """Run the agent with user input."""
-        # Initialize messages with system prompt
-        self.messages = [
-            {"role": "system", "content": self.prompts["system_prompt"]},
-            {"role": "user", "content": user_input},
-        ]
+        state = self._new_run_state(user_input)
+        # Expose the history of the most recent run to callers
+        self.messages = state.messages
+        return await self._run_conversation(state)
 
-        self.iteration_count = 0
-        final_response = ""
+    async def run_many(self, inputs: list[str], max_concurrency: int = 10) -> list[str]:
+        """Run independent conversations concurrently on this agent.
+
+        Results are returned in input order. ``max_concurrency`` bounds the
+        number of conversations in flight so the connection pool is not
+        saturated.
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
 
-        while self.iteration_count < self.config.max_iterations:
-            self.iteration_count += 1
+        async def run_one(user_input: str) -> str:
+            async with semaphore:
+                return await self._run_conversation(self._new_run_state(user_input))
+
+        return list(await asyncio.gather(*(run_one(x) for x in inputs)))
+
+    async def run_batch(
+        self,
+        prompts: Mapping[str, str],
+        response_format: dict[str, Any] | None = None,
+        poll_interval: float = BATCH_POLL_INTERVAL,
+    ) -> dict[str, str]:
+        """Answer single-turn prompts through the OpenAI Batch API.
+
+        Keys of ``prompts`` are used as the batch custom ids. Batch requests
+        cannot continue a tool loop, so no tools are offered. Returns the final
+        message content per id; requests that failed in the batch are omitted.
+        """
+        if self.config.model_provider != ModelProvider.OPENAI:
+            raise ValueError(
+                f"Batch API is not supported for {self.config.model_provider}"
+            )
+
+        lines = []
+        for custom_id, prompt in prompts.items():
+            body: dict[str, Any] = {
+                "model": self.config.model_name,
+                "messages": [self._system_message, {"role": "user", "content": prompt}],
+                "temperature": self.config.temperature,
+                "max_tokens": self.config.max_tokens,
+            }
+            if response_format is not None:
+                body["response_format"] = response_format
+            lines.append(
+                json_dumps(
+                    {
+                        "custom_id": custom_id,
+                        "method": "POST",
+                        "url": "/v1/chat/completions",
+                        "body": body,
+                    }
+                )
+            )
+
+        batch_file = await self.client.files.create(
+            file=("batch.jsonl", "\n".join(lines).encode()), purpose="batch"
+        )
+        batch = await self.client.batches.create(
+            input_file_id=batch_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h",
+        )
+        if self.config.verbose:
             console.print(
-                f"\n[dim]Iteration {self.iteration_count}/{self.config.max_iterations}[/dim]"
+                f"[dim]Submitted batch {batch.id} ({len(lines)} requests)[/dim]"
             )
 
-            # Get LLM response
-            response = await self._get_llm_response()
+        while batch.status not in _BATCH_FINAL_STATUSES:
+            await asyncio.sleep(poll_interval)
+            batch = await self.client.batches.retrieve(batch.id)
+
+        if batch.output_file_id is None:
+            raise RuntimeError(f"Batch {batch.id} finished with status {batch.status}")
+
+        output = await self.client.files.content(batch.output_file_id)
+        contents: dict[str, str] = {}
+        for line in output.text.splitlines():
+            record = json_loads(line)
+            response = record.get("response")
+            if record.get("error") or not response or response["status_code"] != 200:
+                logger.warning(
+                    "Batch request %s failed: %s",
+                    record.get("custom_id"),
+                    record.get("error") or response,
+                )
+                continue
+            message = response["body"]["choices"][0]["message"]
+            contents[record["custom_id"]] = message["content"]
+
+        return contents
 
-            # Add assistant message to history
-            # if self.config.model_provider == ModelProvider.OPENAI:
-            self.messages.append(response["raw_message"])
+    def _new_run_state(self, user_input: str) -> RunState:
+        """Create the state for a new conversation."""
+        # Initialize messages with system prompt
+        return RunState(
+            messages=[self._system_message, {"role": "user", "content": user_input}]
+        )
 
-            # Display response
-            self._display_response(response["content"], response["tool_calls"])
+    async def _run_conversation(self, state: RunState) -> str:
+        """Run the agent loop until the LLM stops calling tools."""
+        final_response = ""
+
+        while state.iteration < self.config.max_iterations:
+            state.iteration += 1
+            logger.debug("Iteration %d/%d", state.iteration, self.config.max_iterations)
+            if self.config.verbose:
+                console.print(
+                    f"\n[dim]Iteration {state.iteration}/{self.config.max_iterations}[/dim]"
+                )
+
+            state.started_tools.clear()
+            state.deduped_tools.clear()
+            tool_results: list[ToolResult] = []
+            try:
+                # The group cancels in-flight tools if the stream or a tool fails
+                async with asyncio.TaskGroup() as tool_group:
+                    # Get LLM response, starting tools while the rest is streamed
+                    response = await self._get_llm_response(
+                        state,
+                        functools.partial(self._start_tool_call, tool_group, state),
+                    )
+
+                    # Display response
+                    if self.config.verbose:
+                        self._display_response(
+                            response["content"], response["tool_calls"]
+                        )
+
+                    if response["tool_calls"]:
+                        tool_results = await self._execute_tool_calls(
+                            state, tool_group, response["tool_calls"]
+                        )
+            except BaseExceptionGroup as eg:
+                raise eg.exceptions[0] from None
 
-            # If there are tool calls, execute them
+            # Add assistant message to history
+            state.messages.append(response["raw_message"])
+
+            # If there are tool calls, add their results
             if response["tool_calls"]:
-                tool_results = await self._execute_tool_calls(response["tool_calls"])
-                self._display_tool_results(tool_results)
-                self._add_tool_results_to_messages(tool_results)
+                if self.config.verbose:
+                    self._display_tool_results(tool_results)
+                self._add_tool_results_to_messages(state, tool_results)
             else:
                 # No more tool calls, we have the final response
                 final_response = response["content"]
                 break
 
-        if self.iteration_count >= self.config.max_iterations:
-            console.print("[red]Maximum iterations reached![/red]")
+        if state.iteration >= self.config.max_iterations:
+            logger.warning(
+                "Maximum iterations reached (%d)", self.config.max_iterations
+            )
 
         return final_response
@@ -1,17 +1,116 @@
-import json
-from dataclasses import dataclass, field
-from typing import Any
-
+import asyncio
+import hashlib
+import math
+import string
+from collections.abc import Mapping, Sequence
+from dataclasses import asdict, dataclass
+from typing import Any, ClassVar
+
+import numpy as np
 from openai import AsyncOpenAI
-from pydantic import BaseModel, Field, field_validator
-from rich.console import Console
+from pydantic import BaseModel, Field, ValidationError, field_validator
+from rich.console import Console, Group
+from rich.panel import Panel
 from rich.table import Table
+from rich.text import Text
 
 from agents.base_agent import AgentConfig, BaseAgent
+from tools.cache import default_cache
 from tools.fatsecret_tool import search_food_nutrition, search_recipes_by_ingredients
 from tools.nutrition_calculator import calculate_pfc_balance
+from utils.serialization import json_dumps
+
+# Output uses explicit markup only, so skip Rich's highlighter and emoji codes
+console = Console(highlight=False, emoji=False)
+
+# Cap on concurrent FatSecret lookups when prefetching inventory nutrition
+NUTRITION_PREFETCH_CONCURRENCY = 10
 
-console = Console()
+# Row labels for the three meals of a day, in display order
+_MEAL_TYPES = ("Breakfast", "Lunch", "Dinner")
+
+# Fixed-width layout of the meal table for plain (non-terminal) output
+_ROW = "{meal:<12}{cal:>9}{p:>12}{f:>9}{c:>10}\n"
+_HEADER = _ROW.format(
+    meal="Meal", cal="Calories", p="Protein (g)", f="Fat (g)", c="Carbs (g)"
+)
+
+# Meal-planning request; the constant text is parsed once at import and each
+# call only fills in the scenario-specific slots. The scenario and output
+# format are shared by the tool-using prompt and the tool-free batch prompt.
+_MEAL_PLAN_SCENARIO = """        AVAILABLE INGREDIENTS:
+        $inventory_text
+        
+        NUTRITIONAL TARGETS:
+        - Daily calories: $daily_calories kcal
+        - PFC ratio: $protein_pct% protein, $fat_pct% fat, $carbs_pct% carbohydrates
+        - Allergens to avoid: $allergens_text
+        - Dietary restrictions: $restrictions_text
+        $nutrition_text
+"""
+_MEAL_PLAN_FORMAT = """        After gathering all necessary information and creating the meal plan, provide the final result in the following JSON format:
+        {
+            "meal_plans": [
+                {
+                    "day": 1,
+                    "breakfast": {
+                        "name": "meal name",
+                        "ingredients": ["ingredient1", "ingredient2"],
+                        "calories": 300,
+                        "protein_g": 20,
+                        "fat_g": 10,
+                        "carbs_g": 30,
+                        "cooking_instructions": "detailed instructions"
+                    },
+                    "lunch": { ... similar structure ... },
+                    "dinner": { ... similar structure ... },
+                    "daily_nutrition": {
+                        "total_calories": 2000,
+                        "total_protein_g": 100,
+                        "total_fat_g": 60,
+                        "total_carbs_g": 250,
+                        "pfc_ratio": [20.0, 27.0, 53.0]
+                    },
+                    "missing_ingredients": ["ingredient1", "ingredient2"],
+                    "notes": "any additional notes"
+                }
+            ],
+            "total_missing_ingredients": ["all missing ingredients"],
+            "general_notes": "general notes about the meal plan"
+        }
+        """
+_MEAL_PLAN_PROMPT = string.Template(
+    """
+        Create a detailed $days-day meal plan using the available tools and information provided.
+        
+"""
+    + _MEAL_PLAN_SCENARIO
+    + """        INSTRUCTIONS:
+        1. $lookup_instruction
+        2. Use the search_recipes_by_ingredients tool to find recipes that can be made with available ingredients
+        3. Use the calculate_pfc_balance tool to verify your meal plan meets the nutritional targets
+        4. Create realistic meals with accurate nutrition calculations based on the tool results
+        5. Provide detailed cooking instructions for each meal
+        6. List any missing ingredients needed for the meal plan
+        
+"""
+    + _MEAL_PLAN_FORMAT
+)
+_BATCH_MEAL_PLAN_PROMPT = string.Template(
+    """
+        Create a detailed $days-day meal plan using the information provided.
+        
+"""
+    + _MEAL_PLAN_SCENARIO
+    + """        INSTRUCTIONS:
+        1. Base all nutrition calculations on the nutrition data above; no tools are available for this request
+        2. Create realistic meals that meet the nutritional targets
+        3. Provide detailed cooking instructions for each meal
+        4. List any missing ingredients needed for the meal plan
+        
+"""
+    + _MEAL_PLAN_FORMAT
+)
 
 
 # Pydantic models for structured output
@@ -41,9 +140,8 @@ class DailyNutritionStructured(BaseModel):
     @field_validator("pfc_ratio")
     @classmethod
     def validate_pfc_ratio(cls, v: list[float]) -> list[float]:
-        if len(v) != 3:
-            raise ValueError("PFC ratio must have exactly 3 values")
-        if abs(sum(v) - 100.0) > 1.0:  # Allow 1% tolerance
+        # Length is already enforced by min_length/max_length on the field
+        if abs(math.fsum(v) - 100.0) > 1.0:  # Allow 1% tolerance
             raise ValueError("PFC ratio percentages should sum to approximately 100%")
         return v
 
@@ -68,34 +166,147 @@ class MealPlansResponse(BaseModel):
     general_notes: str = ""
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Inventory:
-    items: list[dict[str, Any]]  # {"name": str, "amount_g": float, "unit": str}
+    items: Sequence[dict[str, Any]]  # {"name": str, "amount_g": float, "unit": str}
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "items", tuple(self.items))
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class DietaryConstraints:
     daily_calories: float
     pfc_ratio: tuple[float, float, float]  # Protein%, Fat%, Carbs%
-    allergens: list[str] = field(default_factory=list)
-    dietary_restrictions: list[str] = field(
-        default_factory=list
-    )  # vegetarian, vegan, low-carb, etc.
+    allergens: Sequence[str] = ()
+    dietary_restrictions: Sequence[str] = ()  # vegetarian, vegan, low-carb, etc.
+
+    def __post_init__(self) -> None:
+        # Scenario files and the CLI pass lists (or null); store hashable tuples
+        object.__setattr__(self, "pfc_ratio", tuple(self.pfc_ratio))
+        object.__setattr__(self, "allergens", tuple(self.allergens or ()))
+        object.__setattr__(
+            self, "dietary_restrictions", tuple(self.dietary_restrictions or ())
+        )
+
+
+@dataclass(slots=True, frozen=True)
+class Meal:
+    name: str
+    ingredients: Sequence[str]
+    calories: float
+    protein_g: float
+    fat_g: float
+    carbs_g: float
+    cooking_instructions: str = ""
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "ingredients", tuple(self.ingredients))
+
+
+@dataclass(slots=True, frozen=True)
+class DailyNutrition:
+    total_calories: float
+    total_protein_g: float
+    total_fat_g: float
+    total_carbs_g: float
+    pfc_ratio: tuple[float, float, float]  # Protein%, Fat%, Carbs%
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "pfc_ratio", tuple(self.pfc_ratio))
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class MealPlan:
     day: int
-    breakfast: dict[str, Any]
-    lunch: dict[str, Any]
-    dinner: dict[str, Any]
-    daily_nutrition: dict[str, Any]
-    missing_ingredients: list[str]
+    breakfast: Meal
+    lunch: Meal
+    dinner: Meal
+    daily_nutrition: DailyNutrition
+    missing_ingredients: Sequence[str]
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "missing_ingredients", tuple(self.missing_ingredients))
 
 
 class NutritionPlannerAgent(BaseAgent):
-    def __init__(self, config: AgentConfig):
-        super().__init__(config)
+    # Final answers are validated against MealPlansResponse
+    response_format: ClassVar[dict[str, Any] | None] = {
+        "type": "json_schema",
+        "json_schema": {
+            "name": "meal_plans_response",
+            "schema": MealPlansResponse.model_json_schema(),
+        },
+    }
+
+    # JSON schemas for the registered tools, shared by all instances
+    _FOOD_SCHEMA: ClassVar[dict[str, Any]] = {
+        "type": "object",
+        "properties": {
+            "food_name": {
+                "type": "string",
+                "description": "Name of the food item to search",
+            }
+        },
+        "required": ["food_name"],
+    }
+    _RECIPE_SCHEMA: ClassVar[dict[str, Any]] = {
+        "type": "object",
+        "properties": {
+            "ingredients": {
+                "type": "array",
+                "items": {"type": "string"},
+                "description": "List of available ingredients",
+            },
+            "dietary_restrictions": {
+                "type": "array",
+                "items": {"type": "string"},
+                "description": "Dietary restrictions (optional)",
+            },
+        },
+        "required": ["ingredients"],
+    }
+    _PFC_SCHEMA: ClassVar[dict[str, Any]] = {
+        "type": "object",
+        "properties": {
+            "meals": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "name": {"type": "string"},
+                        "calories": {"type": "number"},
+                        "protein_g": {"type": "number"},
+                        "fat_g": {"type": "number"},
+                        "carbs_g": {"type": "number"},
+                    },
+                    "required": [
+                        "name",
+                        "calories",
+                        "protein_g",
+                        "fat_g",
+                        "carbs_g",
+                    ],
+                },
+                "description": "List of meals with nutrition info",
+            },
+            "target_calories": {
+                "type": "number",
+                "description": "Target daily calories",
+            },
+            "target_pfc": {
+                "type": "array",
+                "items": {"type": "number"},
+                "minItems": 3,
+                "maxItems": 3,
+                "description": "Target PFC ratio as [protein%, fat%, carbs%]",
+            },
+        },
+        "required": ["meals", "target_calories", "target_pfc"],
+    }
+
+    def __init__(self, config: AgentConfig, client: AsyncOpenAI | None = None):
+        super().__init__(config, client)
         self._register_nutrition_tools()
 
     def _register_nutrition_tools(self) -> None:
@@ -106,16 +317,7 @@ class NutritionPlannerAgent(BaseAgent):
             name="search_food_nutrition",
             func=search_food_nutrition,
             description="Search for nutritional information of food items",
-            parameters={
-                "type": "object",
-                "properties": {
-                    "food_name": {
-                        "type": "string",
-                        "description": "Name of the food item to search",
-                    }
-                },
-                "required": ["food_name"],
-            },
+            parameters=self._FOOD_SCHEMA,
         )
 
         # Recipe search
@@ -123,22 +325,7 @@ class NutritionPlannerAgent(BaseAgent):
             name="search_recipes_by_ingredients",
             func=search_recipes_by_ingredients,
             description="Search for recipes based on available ingredients",
-            parameters={
-                "type": "object",
-                "properties": {
-                    "ingredients": {
-                        "type": "array",
-                        "items": {"type": "string"},
-                        "description": "List of available ingredients",
-                    },
-                    "dietary_restrictions": {
-                        "type": "array",
-                        "items": {"type": "string"},
-                        "description": "Dietary restrictions (optional)",
-                    },
-                },
-                "required": ["ingredients"],
-            },
+            parameters=self._RECIPE_SCHEMA,
         )
 
         # PFC balance calculator
@@ -146,44 +333,7 @@ class NutritionPlannerAgent(BaseAgent):
             name="calculate_pfc_balance",
             func=calculate_pfc_balance,
             description="Calculate protein-fat-carbohydrate balance for meals",
-            parameters={
-                "type": "object",
-                "properties": {
-                    "meals": {
-                        "type": "array",
-                        "items": {
-                            "type": "object",
-                            "properties": {
-                                "name": {"type": "string"},
-                                "calories": {"type": "number"},
-                                "protein_g": {"type": "number"},
-                                "fat_g": {"type": "number"},
-                                "carbs_g": {"type": "number"},
-                            },
-                            "required": [
-                                "name",
-                                "calories",
-                                "protein_g",
-                                "fat_g",
-                                "carbs_g",
-                            ],
-                        },
-                        "description": "List of meals with nutrition info",
-                    },
-                    "target_calories": {
-                        "type": "number",
-                        "description": "Target daily calories",
-                    },
-                    "target_pfc": {
-                        "type": "array",
-                        "items": {"type": "number"},
-                        "minItems": 3,
-                        "maxItems": 3,
-                        "description": "Target PFC ratio as [protein%, fat%, carbs%]",
-                    },
-                },
-                "required": ["meals", "target_calories", "target_pfc"],
-            },
+            parameters=self._PFC_SCHEMA,
         )
 
     async def generate_meal_plan(
@@ -194,65 +344,22 @@ class NutritionPlannerAgent(BaseAgent):
     ) -> list[MealPlan]:
         """Generate a multi-day meal plan based on inventory and constraints.
         This method uses the base agent's run method to handle tool calls automatically.
+        With ``cache_meal_plans`` enabled, plans for a request seen before are
+        read back from the tool cache database without calling the model.
         """
-
-        # Prepare inventory and constraints information
-        inventory_text = "\n".join(
-            [f"- {item['name']}: {item['amount_g']}g" for item in inventory.items]
+        cache_key = (
+            self._meal_plan_cache_key(inventory, constraints, days)
+            if self.config.cache_meal_plans
+            else None
         )
+        if cache_key is not None:
+            cached = default_cache.get(cache_key)
+            if cached is not None:
+                return self._convert_structured_to_meal_plans(
+                    MealPlansResponse.model_validate(cached)
+                )
 
-        # Create comprehensive prompt that encourages tool usage
-        prompt = f"""
-        Create a detailed {days}-day meal plan using the available tools and information provided.
-        
-        AVAILABLE INGREDIENTS:
-        {inventory_text}
-        
-        NUTRITIONAL TARGETS:
-        - Daily calories: {constraints.daily_calories} kcal
-        - PFC ratio: {constraints.pfc_ratio[0]}% protein, {constraints.pfc_ratio[1]}% fat, {constraints.pfc_ratio[2]}% carbohydrates
-        - Allergens to avoid: {", ".join(constraints.allergens) if constraints.allergens else "None"}
-        - Dietary restrictions: {", ".join(constraints.dietary_restrictions) if constraints.dietary_restrictions else "None"}
-        
-        INSTRUCTIONS:
-        1. First, use the search_food_nutrition tool to get accurate nutritional information for key available ingredients
-        2. Use the search_recipes_by_ingredients tool to find recipes that can be made with available ingredients
-        3. Use the calculate_pfc_balance tool to verify your meal plan meets the nutritional targets
-        4. Create realistic meals with accurate nutrition calculations based on the tool results
-        5. Provide detailed cooking instructions for each meal
-        6. List any missing ingredients needed for the meal plan
-        
-        After gathering all necessary information and creating the meal plan, provide the final result in the following JSON format:
-        {{
-            "meal_plans": [
-                {{
-                    "day": 1,
-                    "breakfast": {{
-                        "name": "meal name",
-                        "ingredients": ["ingredient1", "ingredient2"],
-                        "calories": 300,
-                        "protein_g": 20,
-                        "fat_g": 10,
-                        "carbs_g": 30,
-                        "cooking_instructions": "detailed instructions"
-                    }},
-                    "lunch": {{ ... similar structure ... }},
-                    "dinner": {{ ... similar structure ... }},
-                    "daily_nutrition": {{
-                        "total_calories": 2000,
-                        "total_protein_g": 100,
-                        "total_fat_g": 60,
-                        "total_carbs_g": 250,
-                        "pfc_ratio": [20.0, 27.0, 53.0]
-                    }},
-                    "missing_ingredients": ["ingredient1", "ingredient2"],
-                    "notes": "any additional notes"
-                }}
-            ],
-            "total_missing_ingredients": ["all missing ingredients"],
-            "general_notes": "general notes about the meal plan"
-        }}
-        """
+        prompt = await self._build_meal_plan_prompt(inventory, constraints, days)
 
         # Use the base agent's run method
         console.print(
@@ -262,157 +369,315 @@ class NutritionPlannerAgent(BaseAgent):
         # Run the agent with the prompt
         response = await self.run(prompt)
 
-        # Parse the JSON response
+        # The final answer follows MealPlansResponse via response_format
         try:
-            # Extract JSON from the response
-            json_start = response.find("{")
-            json_end = response.rfind("}") + 1
-            if json_start != -1 and json_end > json_start:
-                json_str = response[json_start:json_end]
-                meal_plans_data = json.loads(json_str)
-
-                # Convert to MealPlansResponse structure
-                structured_response = MealPlansResponse(**meal_plans_data)
-                return self._convert_structured_to_meal_plans(structured_response)
-            else:
-                # If no JSON found, try using structured output
+            structured_response = MealPlansResponse.model_validate_json(response)
+        except ValidationError as e:
+            # Schema adherence is not strict, so repair with a structured parse
+            # of the finished conversation
+            console.print(
+                f"[yellow]Response did not match the meal plan schema ({e.error_count()} errors), trying structured output...[/yellow]"
+            )
+            assert isinstance(self.client, AsyncOpenAI)
+            structured_completion = await self.client.beta.chat.completions.parse(
+                model=self.config.model_name,
+                messages=self.messages,  # type: ignore[arg-type]
+                response_format=MealPlansResponse,
+                temperature=0,
+            )
+            parsed_response = structured_completion.choices[0].message.parsed
+            if not parsed_response:
+                raise ValueError(
+                    "Failed to get structured response from OpenAI API"
+                ) from e
+            structured_response = parsed_response
+
+        if cache_key is not None:
+            default_cache.set(cache_key, structured_response.model_dump())
+        return self._convert_structured_to_meal_plans(structured_response)
+
+    def _meal_plan_cache_key(
+        self, inventory: Inventory, constraints: DietaryConstraints, days: int
+    ) -> str:
+        """Hash the model settings and scenario that determine a meal plan."""
+        payload = json_dumps(
+            [
+                self.config.model_name,
+                self.config.temperature,
+                self.config.max_tokens,
+                sorted(inventory.items, key=lambda item: item["name"]),
+                asdict(constraints),
+                days,
+            ],
+            sort_keys=True,
+        )
+        digest = hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+        return f"meal_plan:{digest}"
+
+    async def generate_meal_plans_batch(
+        self,
+        scenarios: Mapping[str, tuple[Inventory, DietaryConstraints]],
+        days: int = 3,
+    ) -> dict[str, list[MealPlan]]:
+        """Generate meal plans for many scenarios in one Batch API job.
+
+        Each plan is a single structured-output completion built on the
+        prefetched nutrition data, since batch requests cannot call tools.
+        Scenarios without any prefetched nutrition are not submitted, and
+        they are left out of the result like those whose request or parsing
+        failed.
+        """
+        prompts = await asyncio.gather(
+            *(
+                self._build_batch_meal_plan_prompt(inventory, constraints, days)
+                for inventory, constraints in scenarios.values()
+            )
+        )
+        requests: dict[str, str] = {}
+        for scenario_id, prompt in zip(scenarios, prompts, strict=True):
+            if prompt is None:
                 console.print(
-                    "[yellow]No valid JSON found in response, trying structured output...[/yellow]"
+                    f"[red]Skipping {scenario_id}: no nutrition data could be "
+                    "prefetched for a tool-free batch request[/red]"
                 )
+            else:
+                requests[scenario_id] = prompt
+        if not requests:
+            return {}
+
+        contents = await self.run_batch(requests, response_format=self.response_format)
+
+        meal_plans: dict[str, list[MealPlan]] = {}
+        for scenario_id, content in contents.items():
+            try:
+                structured_response = MealPlansResponse.model_validate_json(content)
+            except ValidationError as e:
+                console.print(f"[red]Invalid meal plan for {scenario_id}: {e}[/red]")
+                continue
+            meal_plans[scenario_id] = self._convert_structured_to_meal_plans(
+                structured_response
+            )
+        return meal_plans
 
-                # Get the message history from the last run
-                assert isinstance(self.client, AsyncOpenAI)
+    async def _build_meal_plan_prompt(
+        self, inventory: Inventory, constraints: DietaryConstraints, days: int
+    ) -> str:
+        """Build the meal-planning request for one inventory and constraint set."""
+        # Look up every inventory item up front instead of one tool call at a time
+        nutrition = await self._prefetch_inventory_nutrition(inventory)
+        if nutrition:
+            lookup_instruction = (
+                "Use the nutrition data above; only call search_food_nutrition "
+                "for ingredients it does not cover"
+            )
+        else:
+            lookup_instruction = (
+                "First, use the search_food_nutrition tool to get accurate "
+                "nutritional information for key available ingredients"
+            )
 
-                # Use structured output with the existing message history
-                structured_completion = await self.client.beta.chat.completions.parse(
-                    model=self.config.model_name,
-                    messages=self.messages,  # type: ignore[arg-type]
-                    response_format=MealPlansResponse,
-                    temperature=0,
-                )
+        return _MEAL_PLAN_PROMPT.substitute(
+            self._meal_plan_prompt_fields(inventory, constraints, days, nutrition),
+            lookup_instruction=lookup_instruction,
+        )
 
-                parsed_response = structured_completion.choices[0].message.parsed
-                if parsed_response:
-                    return self._convert_structured_to_meal_plans(parsed_response)
-                else:
-                    raise ValueError(
-                        "Failed to get structured response from OpenAI API"
-                    )
+    async def _build_batch_meal_plan_prompt(
+        self, inventory: Inventory, constraints: DietaryConstraints, days: int
+    ) -> str | None:
+        """Build the tool-free request used for the Batch API.
 
-        except json.JSONDecodeError as e:
-            console.print(f"[red]Failed to parse JSON response: {e}[/red]")
-            console.print(f"[red]Response was: {response}[/red]")
-            raise ValueError(f"Failed to parse meal plan response: {e}")
+        Returns None when no nutrition data could be prefetched, since the
+        model would have nothing to base its calculations on.
+        """
+        nutrition = await self._prefetch_inventory_nutrition(inventory)
+        if not nutrition:
+            return None
+        return _BATCH_MEAL_PLAN_PROMPT.substitute(
+            self._meal_plan_prompt_fields(inventory, constraints, days, nutrition)
+        )
 
-    def _convert_structured_to_meal_plans(
-        self, structured_response: MealPlansResponse
-    ) -> list[MealPlan]:
-        """Convert structured Pydantic response to MealPlan dataclasses."""
-        meal_plans = []
-
-        for plan_data in structured_response.meal_plans:
-            # Convert Pydantic models to dictionaries for MealPlan dataclass
-            breakfast_dict = {
-                "name": plan_data.breakfast.name,
-                "ingredients": plan_data.breakfast.ingredients,
-                "calories": plan_data.breakfast.calories,
-                "protein_g": plan_data.breakfast.protein_g,
-                "fat_g": plan_data.breakfast.fat_g,
-                "carbs_g": plan_data.breakfast.carbs_g,
-                "cooking_instructions": plan_data.breakfast.cooking_instructions,
-            }
+    @staticmethod
+    def _meal_plan_prompt_fields(
+        inventory: Inventory,
+        constraints: DietaryConstraints,
+        days: int,
+        nutrition: dict[str, dict[str, Any]],
+    ) -> dict[str, Any]:
+        """Values for the scenario slots shared by both meal-planning prompts."""
+        # Prepare inventory and constraints information
+        inventory_text = "\n".join(
+            f"- {item['name']}: {item['amount_g']}g" for item in inventory.items
+        )
+        allergens_text = (
+            ", ".join(constraints.allergens) if constraints.allergens else "None"
+        )
+        restrictions_text = (
+            ", ".join(constraints.dietary_restrictions)
+            if constraints.dietary_restrictions
+            else "None"
+        )
+        nutrition_text = (
+            "\n        NUTRITION DATA (per 100g, already looked up):\n"
+            f"        {json_dumps(nutrition)}\n"
+            if nutrition
+            else ""
+        )
 
-            lunch_dict = {
-                "name": plan_data.lunch.name,
-                "ingredients": plan_data.lunch.ingredients,
-                "calories": plan_data.lunch.calories,
-                "protein_g": plan_data.lunch.protein_g,
-                "fat_g": plan_data.lunch.fat_g,
-                "carbs_g": plan_data.lunch.carbs_g,
-                "cooking_instructions": plan_data.lunch.cooking_instructions,
-            }
+        return {
+            "days": days,
+            "inventory_text": inventory_text,
+            "daily_calories": constraints.daily_calories,
+            "protein_pct": constraints.pfc_ratio[0],
+            "fat_pct": constraints.pfc_ratio[1],
+            "carbs_pct": constraints.pfc_ratio[2],
+            "allergens_text": allergens_text,
+            "restrictions_text": restrictions_text,
+            "nutrition_text": nutrition_text,
+        }
+
+    async def _prefetch_inventory_nutrition(
+        self, inventory: Inventory
+    ) -> dict[str, dict[str, Any]]:
+        """Fetch nutrition for all inventory items concurrently.
+
+        Returns the best match per ingredient; failed lookups are left out so
+        the model can still fall back to the search tool.
+        """
+        semaphore = asyncio.Semaphore(NUTRITION_PREFETCH_CONCURRENCY)
 
-            dinner_dict = {
-                "name": plan_data.dinner.name,
-                "ingredients": plan_data.dinner.ingredients,
-                "calories": plan_data.dinner.calories,
-                "protein_g": plan_data.dinner.protein_g,
-                "fat_g": plan_data.dinner.fat_g,
-                "carbs_g": plan_data.dinner.carbs_g,
-                "cooking_instructions": plan_data.dinner.cooking_instructions,
-            }
+        async def lookup(name: str) -> dict[str, Any]:
+            async with semaphore:
+                return await search_food_nutrition(name)
 
-            daily_nutrition_dict = {
-                "total_calories": plan_data.daily_nutrition.total_calories,
-                "total_protein_g": plan_data.daily_nutrition.total_protein_g,
-                "total_fat_g": plan_data.daily_nutrition.total_fat_g,
-                "total_carbs_g": plan_data.daily_nutrition.total_carbs_g,
-                "pfc_ratio": tuple(
-                    plan_data.daily_nutrition.pfc_ratio
-                ),  # Convert list to tuple
-            }
+        names = list(dict.fromkeys(item["name"] for item in inventory.items))
+        results = await asyncio.gather(
+            *(lookup(name) for name in names), return_exceptions=True
+        )
+
+        nutrition: dict[str, dict[str, Any]] = {}
+        for name, result in zip(names, results, strict=True):
+            if isinstance(result, BaseException) or not result["foods"]:
+                continue
+            food = result["foods"][0]
+            nutrition[name] = {"match": food["name"], **food["nutrition_per_100g"]}
+
+        console.print(
+            f"[yellow]Prefetched nutrition for {len(nutrition)}/{len(names)} ingredients[/yellow]"
+        )
+        return nutrition
 
-            meal_plan = MealPlan(
+    def _convert_structured_to_meal_plans(
+        self, structured_response: MealPlansResponse
+    ) -> list[MealPlan]:
+        """Convert structured Pydantic response to MealPlan dataclasses."""
+        # Convert Pydantic models to the MealPlan records
+        return [
+            MealPlan(
                 day=plan_data.day,
-                breakfast=breakfast_dict,
-                lunch=lunch_dict,
-                dinner=dinner_dict,
-                daily_nutrition=daily_nutrition_dict,
+                breakfast=Meal(**plan_data.breakfast.model_dump()),
+                lunch=Meal(**plan_data.lunch.model_dump()),
+                dinner=Meal(**plan_data.dinner.model_dump()),
+                daily_nutrition=DailyNutrition(
+                    **plan_data.daily_nutrition.model_dump()
+                ),
                 missing_ingredients=plan_data.missing_ingredients,
             )
-
-            meal_plans.append(meal_plan)
-
-        return meal_plans
+            for plan_data in structured_response.meal_plans
+        ]
 
     def display_meal_plans(self, meal_plans: list[MealPlan]) -> None:
         """Display meal plans in a formatted table."""
-        for plan in meal_plans:
-            # Day header
-            console.print(f"\n[bold cyan]Day {plan.day} Meal Plan[/bold cyan]")
-
-            # Meals table
-            table = Table(show_header=True, header_style="bold magenta")
-            table.add_column("Meal", style="cyan", width=12)
-            table.add_column("Calories", justify="right")
-            table.add_column("Protein (g)", justify="right")
-            table.add_column("Fat (g)", justify="right")
-            table.add_column("Carbs (g)", justify="right")
-
-            # Add meals
-            for meal_type, meal_data in [
-                ("Breakfast", plan.breakfast),
-                ("Lunch", plan.lunch),
-                ("Dinner", plan.dinner),
-            ]:
-                table.add_row(
-                    meal_type,
-                    str(meal_data["calories"]),
-                    str(meal_data["protein_g"]),
-                    str(meal_data["fat_g"]),
-                    str(meal_data["carbs_g"]),
-                )
-
-            # Daily total
-            table.add_row(
-                "[bold]Daily Total[/bold]",
-                f"[bold]{plan.daily_nutrition['total_calories']}[/bold]",
-                f"[bold]{plan.daily_nutrition['total_protein_g']}[/bold]",
-                f"[bold]{plan.daily_nutrition['total_fat_g']}[/bold]",
-                f"[bold]{plan.daily_nutrition['total_carbs_g']}[/bold]",
-                style="green",
+        # Format every day's PFC percentages in one pass
+        pfc_ratios = np.asarray(
+            [plan.daily_nutrition.pfc_ratio for plan in meal_plans], dtype=float
+        ).reshape(-1, 3)
+        pfc_texts = [" / ".join(row) for row in np.char.mod("%.1f%%", pfc_ratios)]
+
+        # Hold all output in the console buffer and write it out once at the end
+        with console:
+            for plan, pfc_text in zip(meal_plans, pfc_texts, strict=True):
+                self._display_meal_plan(plan, pfc_text)
+
+    def _display_meal_plan(self, plan: MealPlan, pfc_text: str) -> None:
+        """Render a single day's meal plan to the console."""
+        if not console.is_terminal:
+            self._display_meal_plan_plain(plan, pfc_text)
+            return
+
+        nutrition = plan.daily_nutrition
+        rows = [
+            (
+                meal_type,
+                f"{meal.calories}",
+                f"{meal.protein_g}",
+                f"{meal.fat_g}",
+                f"{meal.carbs_g}",
             )
+            for meal_type, meal in zip(
+                _MEAL_TYPES, (plan.breakfast, plan.lunch, plan.dinner), strict=True
+            )
+        ]
+
+        # Meals table
+        table = Table(show_header=True, header_style="bold magenta")
+        table.add_column("Meal", style="cyan", width=12)
+        table.add_column("Calories", justify="right")
+        table.add_column("Protein (g)", justify="right")
+        table.add_column("Fat (g)", justify="right")
+        table.add_column("Carbs (g)", justify="right")
+        for row in rows:
+            table.add_row(*row)
+
+        # Daily total
+        table.add_row(
+            "[bold]Daily Total[/bold]",
+            f"[bold]{nutrition.total_calories}[/bold]",
+            f"[bold]{nutrition.total_protein_g}[/bold]",
+            f"[bold]{nutrition.total_fat_g}[/bold]",
+            f"[bold]{nutrition.total_carbs_g}[/bold]",
+            style="green",
+        )
 
-            console.print(table)
-
-            # PFC ratio
-            pfc = plan.daily_nutrition["pfc_ratio"]
-            console.print(
-                f"PFC Ratio: [yellow]{pfc[0]:.1f}% / {pfc[1]:.1f}% / {pfc[2]:.1f}%[/yellow]"
+        # Day header, table, PFC ratio and missing ingredients in one render
+        parts: list[Any] = [
+            f"\n[bold cyan]Day {plan.day} Meal Plan[/bold cyan]",
+            table,
+            f"PFC Ratio: [yellow]{pfc_text}[/yellow]",
+        ]
+        if plan.missing_ingredients:
+            parts.append(
+                f"Missing ingredients: [red]{', '.join(plan.missing_ingredients)}[/red]"
+            )
+        console.print(Group(*parts))
+
+    def _display_meal_plan_plain(self, plan: MealPlan, pfc_text: str) -> None:
+        """Render a day as pre-formatted text, skipping Rich's table layout."""
+        nutrition = plan.daily_nutrition
+        rows = "".join(
+            _ROW.format(
+                meal=meal_type,
+                cal=meal_data.calories,
+                p=meal_data.protein_g,
+                f=meal_data.fat_g,
+                c=meal_data.carbs_g,
+            )
+            for meal_type, meal_data in zip(
+                _MEAL_TYPES, (plan.breakfast, plan.lunch, plan.dinner), strict=True
             )
+        )
+        text = (
+            _HEADER
+            + rows
+            + _ROW.format(
+                meal="Daily Total",
+                cal=nutrition.total_calories,
+                p=nutrition.total_protein_g,
+                f=nutrition.total_fat_g,
+                c=nutrition.total_carbs_g,
+            )
+            + f"PFC Ratio: {pfc_text}"
+        )
+        if plan.missing_ingredients:
+            text += f"\nMissing ingredients: {', '.join(plan.missing_ingredients)}"
 
-            # Missing ingredients
-            if plan.missing_ingredients:
-                console.print(
-                    f"Missing ingredients: [red]{', '.join(plan.missing_ingredients)}[/red]"
-                )
+        console.print(Panel(Text(text), title=f"Day {plan.day} Meal Plan"))
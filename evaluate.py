@@ -8,18 +8,22 @@ using the reward function defined in first_assignment.md.
 
 import asyncio
 from pathlib import Path
+from typing import Any
 
 import typer
 from rich.console import Console
 
 from agents.base_agent import AgentConfig, ModelProvider
 from evaluators.reward_functions.nutrition import NutritionEvaluator
+from utils.serialization import json_loads
 
 console = Console()
 app = typer.Typer(help="Nutrition Agent Evaluation Tool")
 
 
-def get_model_configs(models: list[str]) -> list[tuple[str, AgentConfig]]:
+def get_model_configs(
+    models: list[str], use_batch_api: bool = False, cache_meal_plans: bool = False
+) -> list[tuple[str, AgentConfig]]:
     """Convert model names to AgentConfig objects."""
     configs = []
 
@@ -30,6 +34,8 @@ def get_model_configs(models: list[str]) -> list[tuple[str, AgentConfig]]:
                 model_name=model,
                 temperature=0.7,
                 max_tokens=4000,
+                use_batch_api=use_batch_api,
+                cache_meal_plans=cache_meal_plans,
             )
         else:
             console.print(f"[red]Unknown model: {model}[/red]")
@@ -52,13 +58,32 @@ def run(
     output: str = typer.Option(
         "evaluation_results.json", help="Output file for results"
     ),
+    concurrency: int = typer.Option(
+        8, envvar="EVAL_CONCURRENCY", help="Scenario runs to execute at once"
+    ),
+    batch: bool = typer.Option(
+        False, help="Submit each model's scenarios as one OpenAI Batch API job"
+    ),
+    cache_plans: bool = typer.Option(
+        False, help="Reuse meal plans saved by earlier runs of the same scenario"
+    ),
 ) -> None:
     """Run evaluation on all scenarios with specified models."""
-    asyncio.run(run_evaluation(scenarios_dir, models, days, output))
+    asyncio.run(
+        run_evaluation(
+            scenarios_dir, models, days, output, concurrency, batch, cache_plans
+        )
+    )
 
 
 async def run_evaluation(
-    scenarios_dir: str, models: list[str], days: int, output: str
+    scenarios_dir: str,
+    models: list[str],
+    days: int,
+    output: str,
+    concurrency: int = 8,
+    batch: bool = False,
+    cache_plans: bool = False,
 ) -> None:
     """Main evaluation function."""
     scenarios_path = Path(scenarios_dir)
@@ -69,7 +94,9 @@ async def run_evaluation(
         return
 
     # Get model configurations
-    model_configs = get_model_configs(models)
+    model_configs = get_model_configs(
+        models, use_batch_api=batch, cache_meal_plans=cache_plans
+    )
     if not model_configs:
         console.print("[red]No valid models specified[/red]")
         return
@@ -80,7 +107,7 @@ async def run_evaluation(
     # Run evaluation
     console.print("[bold blue]Starting Nutrition Agent Evaluation[/bold blue]")
     results = await evaluator.evaluate_all_scenarios(
-        scenarios_path, model_configs, days
+        scenarios_path, model_configs, days, max_concurrency=concurrency
     )
 
     # Display results
@@ -152,12 +179,27 @@ def compare(
     output: str = typer.Option(
         "model_comparison.json", help="Output file for comparison"
     ),
+    concurrency: int = typer.Option(
+        8, envvar="EVAL_CONCURRENCY", help="Scenario runs to execute at once"
+    ),
+    batch: bool = typer.Option(
+        False, help="Submit each model's scenarios as one OpenAI Batch API job"
+    ),
+    cache_plans: bool = typer.Option(
+        False, help="Reuse meal plans saved by earlier runs of the same scenario"
+    ),
 ) -> None:
     """Compare multiple models across all scenarios."""
-    asyncio.run(run_model_comparison(models, output))
+    asyncio.run(run_model_comparison(models, output, concurrency, batch, cache_plans))
 
 
-async def run_model_comparison(models: list[str], output: str) -> None:
+async def run_model_comparison(
+    models: list[str],
+    output: str,
+    concurrency: int = 8,
+    batch: bool = False,
+    cache_plans: bool = False,
+) -> None:
     """Run comprehensive model comparison."""
     scenarios_path = Path("data/test_prompts")
     output_path = Path(output)
@@ -167,7 +209,9 @@ async def run_model_comparison(models: list[str], output: str) -> None:
         return
 
     # Get model configurations
-    model_configs = get_model_configs(models)
+    model_configs = get_model_configs(
+        models, use_batch_api=batch, cache_meal_plans=cache_plans
+    )
     if not model_configs:
         console.print("[red]No valid models specified[/red]")
         return
@@ -178,7 +222,7 @@ async def run_model_comparison(models: list[str], output: str) -> None:
     # Run evaluation
     console.print("[bold blue]Running Model Comparison[/bold blue]")
     results = await evaluator.evaluate_all_scenarios(
-        scenarios_path, model_configs, days=3
+        scenarios_path, model_configs, days=3, max_concurrency=concurrency
     )
 
     # Display results
@@ -212,6 +256,16 @@ async def run_model_comparison(models: list[str], output: str) -> None:
 @app.command()
 def validate() -> None:
     """Validate evaluation setup and test scenarios."""
+    asyncio.run(run_validation())
+
+
+async def _load_scenario_file(scenario_file: Path) -> Any:
+    """Read and parse a scenario file off the event loop."""
+    return json_loads(await asyncio.to_thread(scenario_file.read_bytes))
+
+
+async def run_validation() -> None:
+    """Load all scenario files concurrently and check their required keys."""
     scenarios_path = Path("data/test_prompts")
 
     if not scenarios_path.exists():
@@ -225,29 +279,28 @@ def validate() -> None:
         console.print("[red]No scenario files found[/red]")
         return
 
-    import json
+    loaded = await asyncio.gather(
+        *(_load_scenario_file(f) for f in scenario_files), return_exceptions=True
+    )
 
     valid_scenarios = 0
 
-    for scenario_file in scenario_files:
-        try:
-            with open(scenario_file) as f:
-                data = json.load(f)
-
-            # Basic validation
-            required_keys = ["id", "inventory", "constraints"]
-            missing_keys = [key for key in required_keys if key not in data]
-
-            if missing_keys:
-                console.print(
-                    f"[red]❌ {scenario_file.name}: Missing keys: {missing_keys}[/red]"
-                )
-            else:
-                console.print(f"[green]✅ {scenario_file.name}: Valid[/green]")
-                valid_scenarios += 1
-
-        except Exception as e:
-            console.print(f"[red]❌ {scenario_file.name}: Error loading: {e}[/red]")
+    for scenario_file, data in zip(scenario_files, loaded, strict=True):
+        if isinstance(data, BaseException):
+            console.print(f"[red]❌ {scenario_file.name}: Error loading: {data}[/red]")
+            continue
+
+        # Basic validation
+        required_keys = ["id", "inventory", "constraints"]
+        missing_keys = [key for key in required_keys if key not in data]
+
+        if missing_keys:
+            console.print(
+                f"[red]❌ {scenario_file.name}: Missing keys: {missing_keys}[/red]"
+            )
+        else:
+            console.print(f"[green]✅ {scenario_file.name}: Valid[/green]")
+            valid_scenarios += 1
 
     console.print(
         f"\n[bold]Summary: {valid_scenarios}/{len(scenario_files)} scenarios are valid[/bold]"
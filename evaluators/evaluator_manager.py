@@ -2,10 +2,9 @@
 Evaluator manager for coordinating multiple evaluation metrics.
 """
 
+import logging
 from typing import Any
 
-from rich.console import Console
-
 from agents.nutrition_planner import DietaryConstraints, Inventory, MealPlan
 from evaluators.reward_functions.base import (
     MandatoryEvaluator,
@@ -23,11 +22,25 @@ from evaluators.reward_functions.quality import (
     NutritionalBalanceEvaluator,
 )
 
-console = Console()
+logger = logging.getLogger(__name__)
+
+# Order of the components combined by calculate_overall_score
+_SCORE_COMPONENTS = (
+    "nutrition",
+    "constraint_satisfaction",
+    "inventory_utilization",
+    "quality",
+)
 
 
 class EvaluatorManager:
-    """Manages and coordinates multiple evaluation metrics."""
+    """Manages and coordinates multiple evaluation metrics.
+
+    Quality weights are cached, so change evaluators and weights through
+    register_quality_evaluator, unregister_evaluator and
+    update_evaluator_weight; mutating ``quality_evaluators`` or an
+    evaluator's ``weight`` directly is not supported.
+    """
 
     def __init__(self):
         # Score weights (must sum to 1.0)
@@ -37,10 +50,16 @@ class EvaluatorManager:
             "inventory_utilization": 0.25,  # Mandatory: inventory usage
             "quality": 0.20,  # Extensible quality metrics
         }
+        # score_weights in _SCORE_COMPONENTS order; see update_score_weights
+        self._score_weight_vector = self._build_score_weight_vector()
 
         # Initialize evaluators
         self.mandatory_evaluators: dict[str, MandatoryEvaluator] = {}
         self.quality_evaluators: dict[str, QualityEvaluator] = {}
+        # (name, weight) per quality evaluator and their sum; refreshed by the
+        # register/unregister/update methods (see the class docstring)
+        self._quality_weights: list[tuple[str, float]] = []
+        self._quality_weight_sum = 0.0
 
         self._register_default_evaluators()
 
@@ -62,6 +81,7 @@ class EvaluatorManager:
     def register_quality_evaluator(self, evaluator: QualityEvaluator):
         """Register a quality evaluator."""
         self.quality_evaluators[evaluator.name] = evaluator
+        self._recompute_quality_weights()
 
     def unregister_evaluator(self, name: str):
         """Remove an evaluator by name."""
@@ -69,6 +89,15 @@ class EvaluatorManager:
             del self.mandatory_evaluators[name]
         elif name in self.quality_evaluators:
             del self.quality_evaluators[name]
+            self._recompute_quality_weights()
+
+    def _recompute_quality_weights(self) -> None:
+        """Refresh the cached quality evaluator weights."""
+        self._quality_weights = [
+            (name, evaluator.weight)
+            for name, evaluator in self.quality_evaluators.items()
+        ]
+        self._quality_weight_sum = sum(weight for _, weight in self._quality_weights)
 
     def evaluate_constraint_satisfaction(
         self,
@@ -103,41 +132,111 @@ class EvaluatorManager:
         inventory: Inventory,
     ) -> dict[str, Any]:
         """Evaluate all quality metrics."""
-        quality_scores = {}
-        quality_details = {}
+        return self.evaluate_quality_scores_batch([meal_plans], constraints, inventory)[
+            0
+        ]
+
+    def evaluate_quality_scores_batch(
+        self,
+        batches: list[list[MealPlan]],
+        constraints: DietaryConstraints,
+        inventory: Inventory,
+    ) -> list[dict[str, Any]]:
+        """Evaluate all quality metrics for several candidate meal plan lists.
+
+        Each evaluator sees the whole batch at once. If that fails, the
+        candidates are evaluated one at a time, so only those the evaluator
+        cannot handle score 0.
+        """
+        quality_scores: list[dict[str, float]] = [{} for _ in batches]
+        quality_details: list[dict[str, Any]] = [{} for _ in batches]
 
         for name, evaluator in self.quality_evaluators.items():
             try:
-                score, details = evaluator.evaluate(meal_plans, constraints, inventory)
-                quality_scores[name] = score
-                quality_details[name] = details
-            except Exception as e:
-                console.print(f"[red]Error in quality evaluator '{name}': {e}[/red]")
-                quality_scores[name] = 0.0
-                quality_details[name] = {"error": str(e)}
-
-        # Calculate weighted average
-        if quality_scores:
-            total_weight = sum(
-                evaluator.weight for evaluator in self.quality_evaluators.values()
-            )
-            weighted_score = (
-                sum(
-                    score * self.quality_evaluators[name].weight
-                    for name, score in quality_scores.items()
-                )
-                / total_weight
-                if total_weight > 0
-                else 0.0
+                results = evaluator.evaluate_batch(batches, constraints, inventory)
+            except Exception:
+                results = [
+                    self._evaluate_quality_safely(
+                        name, evaluator, meal_plans, constraints, inventory
+                    )
+                    for meal_plans in batches
+                ]
+            for scores, details, (score, detail) in zip(
+                quality_scores, quality_details, results, strict=True
+            ):
+                scores[name] = score
+                details[name] = detail
+
+        return [
+            {
+                "total_score": self._weighted_quality_score(scores),
+                "individual_scores": scores,
+                "details": details,
+            }
+            for scores, details in zip(quality_scores, quality_details, strict=True)
+        ]
+
+    @staticmethod
+    def _evaluate_quality_safely(
+        name: str,
+        evaluator: QualityEvaluator,
+        meal_plans: list[MealPlan],
+        constraints: DietaryConstraints,
+        inventory: Inventory,
+    ) -> tuple[float, dict[str, Any]]:
+        """Run one quality evaluator, scoring 0 if it raises."""
+        try:
+            return evaluator.evaluate(meal_plans, constraints, inventory)
+        except Exception as e:
+            logger.exception("Error in quality evaluator '%s'", name)
+            return 0.0, {"error": str(e)}
+
+    def _weighted_quality_score(self, quality_scores: dict[str, float]) -> float:
+        """Weighted average of the individual quality scores."""
+        if quality_scores and self._quality_weight_sum > 0:
+            weighted_sum = sum(
+                quality_scores[name] * weight for name, weight in self._quality_weights
             )
-        else:
-            weighted_score = 0.0
+            return weighted_sum / self._quality_weight_sum
+        return 0.0
 
-        return {
-            "total_score": weighted_score,
-            "individual_scores": quality_scores,
-            "details": quality_details,
-        }
+    def evaluate_mandatory(
+        self,
+        meal_plans: list[MealPlan],
+        constraints: DietaryConstraints,
+        inventory: Inventory,
+    ) -> dict[str, tuple[float, dict[str, Any], bool]]:
+        """Run every mandatory evaluator once.
+
+        Returns:
+            Mapping of evaluator name to (score, details, is_critical_failure)
+        """
+        return self.evaluate_mandatory_batch([meal_plans], constraints, inventory)[0]
+
+    def evaluate_mandatory_batch(
+        self,
+        batches: list[list[MealPlan]],
+        constraints: DietaryConstraints,
+        inventory: Inventory,
+    ) -> list[dict[str, tuple[float, dict[str, Any], bool]]]:
+        """Run every mandatory evaluator once over several candidate lists.
+
+        Returns:
+            One evaluate_mandatory mapping per entry of `batches`, in order
+        """
+        results: list[dict[str, tuple[float, dict[str, Any], bool]]] = [
+            {} for _ in batches
+        ]
+        for name, evaluator in self.mandatory_evaluators.items():
+            for result, outcome in zip(
+                results,
+                evaluator.evaluate_batch_with_failure_check(
+                    batches, constraints, inventory
+                ),
+                strict=True,
+            ):
+                result[name] = outcome
+        return results
 
     def check_critical_failures(
         self,
@@ -169,12 +268,15 @@ class EvaluatorManager:
             return 0.0
 
         # Calculate weighted total score
-        total_score = (
-            nutrition_score * self.score_weights["nutrition"]
-            + constraint_satisfaction_score
-            * self.score_weights["constraint_satisfaction"]
-            + inventory_utilization_score * self.score_weights["inventory_utilization"]
-            + quality_scores.get("total_score", 0.0) * self.score_weights["quality"]
+        scores = (
+            nutrition_score,
+            constraint_satisfaction_score,
+            inventory_utilization_score,
+            quality_scores.get("total_score", 0.0),
+        )
+        total_score = sum(
+            score * weight
+            for score, weight in zip(scores, self._score_weight_vector, strict=True)
         )
 
         return min(1.0, max(0.0, total_score))
@@ -208,6 +310,11 @@ class EvaluatorManager:
             raise ValueError("Score weights must sum to 1.0")
 
         self.score_weights.update(new_weights)
+        self._score_weight_vector = self._build_score_weight_vector()
+
+    def _build_score_weight_vector(self) -> tuple[float, ...]:
+        """Return the score weights in _SCORE_COMPONENTS order."""
+        return tuple(self.score_weights[component] for component in _SCORE_COMPONENTS)
 
     def update_evaluator_weight(self, evaluator_name: str, new_weight: float):
         """Update the weight of a specific evaluator."""
@@ -215,5 +322,6 @@ class EvaluatorManager:
             self.mandatory_evaluators[evaluator_name].weight = new_weight
         elif evaluator_name in self.quality_evaluators:
             self.quality_evaluators[evaluator_name].weight = new_weight
+            self._recompute_quality_weights()
         else:
             raise ValueError(f"Evaluator '{evaluator_name}' not found")
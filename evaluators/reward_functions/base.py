@@ -34,6 +34,25 @@ class BaseEvaluator(ABC):
         """
         pass
 
+    def evaluate_batch(
+        self,
+        batches: list[list[MealPlan]],
+        constraints: DietaryConstraints,
+        inventory: Inventory,
+    ) -> list[tuple[float, dict[str, Any]]]:
+        """
+        Evaluate several candidate lists of meal plans for the same scenario.
+
+        Subclasses that can share work across candidates override this; the
+        default evaluates each list in turn.
+
+        Returns:
+            One (score, details) tuple per entry of `batches`, in order
+        """
+        return [
+            self.evaluate(meal_plans, constraints, inventory) for meal_plans in batches
+        ]
+
     @property
     @abstractmethod
     def name(self) -> str:
@@ -65,6 +84,45 @@ class MandatoryEvaluator(BaseEvaluator):
         """
         pass
 
+    def evaluate_with_failure_check(
+        self,
+        meal_plans: list[MealPlan],
+        constraints: DietaryConstraints,
+        inventory: Inventory,
+    ) -> tuple[float, dict[str, Any], bool]:
+        """
+        Evaluate and check for critical failure in one call.
+
+        Subclasses whose evaluation already determines the failure override
+        this to avoid computing it twice.
+
+        Returns:
+            Tuple of (score, details, is_critical_failure)
+        """
+        score, details = self.evaluate(meal_plans, constraints, inventory)
+        return (
+            score,
+            details,
+            self.is_critical_failure(meal_plans, constraints, inventory),
+        )
+
+    def evaluate_batch_with_failure_check(
+        self,
+        batches: list[list[MealPlan]],
+        constraints: DietaryConstraints,
+        inventory: Inventory,
+    ) -> list[tuple[float, dict[str, Any], bool]]:
+        """
+        Batch form of evaluate_with_failure_check.
+
+        Returns:
+            One (score, details, is_critical_failure) tuple per entry of `batches`
+        """
+        return [
+            self.evaluate_with_failure_check(meal_plans, constraints, inventory)
+            for meal_plans in batches
+        ]
+
 
 class QualityEvaluator(BaseEvaluator):
     """Base class for quality evaluators that assess meal plan quality."""
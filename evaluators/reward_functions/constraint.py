@@ -2,62 +2,102 @@
 Constraint satisfaction evaluator for nutrition meal plans.
 """
 
-import json
+import functools
+import re
+from collections.abc import Sequence
 from typing import Any
 
 import numpy as np
 
-from agents.nutrition_planner import DietaryConstraints, Inventory, MealPlan
+from agents.nutrition_planner import DietaryConstraints, Inventory, Meal, MealPlan
 from evaluators.reward_functions.base import MandatoryEvaluator
+from utils.text import keyword_pattern
+
+# Meal types in the order the meals are stored on a MealPlan
+_MEAL_TYPES = ("breakfast", "lunch", "dinner")
+
+# Ingredient keywords that indicate each allergen; allergens not listed here
+# are matched by name
+_ALLERGEN_KEYWORDS: dict[str, tuple[str, ...]] = {
+    "dairy": ("milk", "cheese", "butter", "cream", "yogurt"),
+    "nuts": ("almond", "peanut", "walnut", "cashew", "pecan"),
+    "gluten": ("wheat", "bread", "pasta", "flour", "barley"),
+    "soy": ("soy", "tofu", "tempeh", "miso"),
+    "shellfish": ("shrimp", "crab", "lobster", "oyster"),
+    "fish": ("salmon", "tuna", "cod", "trout"),
+}
+
+# Label and violating-ingredient pattern for each supported dietary restriction
+_RESTRICTION_RULES: dict[str, tuple[str, re.Pattern[str]]] = {
+    "vegetarian": (
+        "Vegetarian",
+        keyword_pattern(("meat", "beef", "pork", "chicken", "fish", "seafood")),
+    ),
+    "vegan": (
+        "Vegan",
+        keyword_pattern(("meat", "dairy", "egg", "milk", "cheese", "butter", "yogurt")),
+    ),
+    "low-carb": (
+        "Low-carb",
+        keyword_pattern(("bread", "rice", "pasta", "potato", "noodle")),
+    ),
+}
+
+
+@functools.lru_cache(maxsize=64)
+def _allergen_pattern(allergens: frozenset[str]) -> re.Pattern[str]:
+    """Compile one pattern matching any keyword of the given (lowercase) allergens."""
+    return keyword_pattern(
+        {
+            keyword
+            for allergen in allergens
+            for keyword in _ALLERGEN_KEYWORDS.get(allergen, (allergen,))
+        }
+    )
+
+
+@functools.lru_cache(maxsize=1024)
+def _meal_text(meal: Meal) -> str:
+    """Lowercased text of a meal's name, ingredients and instructions.
+
+    Meals are frozen, so the text is built once and shared by the allergen
+    and dietary-restriction checks.
+    """
+    return "\n".join((meal.name, *meal.ingredients, meal.cooking_instructions)).lower()
+
+
+class _MealCorpus:
+    """The text of many meals joined into one string for pattern scans.
+
+    Meals are separated by NUL, which no keyword contains, so a match never
+    spans two meals and one scan of the corpus covers every meal.
+    """
+
+    def __init__(self, plans: list[MealPlan]) -> None:
+        self.plans = plans
+        texts = [
+            _meal_text(meal)
+            for plan in plans
+            for meal in (plan.breakfast, plan.lunch, plan.dinner)
+        ]
+        self.text = "\0".join(texts)
+        # Offset at which each meal's text starts
+        self.starts = np.cumsum([0, *(len(text) + 1 for text in texts[:-1])])
+        self.n_meals = len(texts)
+
+    def matching_meals(self, pattern: re.Pattern[str]) -> np.ndarray:
+        """Sorted indices of the meals that the pattern matches."""
+        if not self.n_meals:
+            return np.empty(0, dtype=np.intp)
+        positions = np.fromiter(
+            (match.start() for match in pattern.finditer(self.text)), dtype=np.intp
+        )
+        return np.unique(np.searchsorted(self.starts, positions, side="right") - 1)
 
 
 class ConstraintSatisfactionEvaluator(MandatoryEvaluator):
     """Evaluates satisfaction of dietary constraints (allergens, dietary restrictions)."""
 
-    def __init__(self, weight: float = 1.0):
-        super().__init__(weight)
-        self.allergen_keywords = {
-            "dairy": [
-                "milk",
-                "cheese",
-                "butter",
-                "cream",
-                "yogurt",
-            ],
-            "nuts": [
-                "almond",
-                "peanut",
-                "walnut",
-                "cashew",
-                "pecan",
-            ],
-            "gluten": [
-                "wheat",
-                "bread",
-                "pasta",
-                "flour",
-                "barley",
-            ],
-            "soy": [
-                "soy",
-                "tofu",
-                "tempeh",
-                "miso",
-            ],
-            "shellfish": [
-                "shrimp",
-                "crab",
-                "lobster",
-                "oyster",
-            ],
-            "fish": [
-                "salmon",
-                "tuna",
-                "cod",
-                "trout",
-            ],
-        }
-
     @property
     def name(self) -> str:
         return "constraint_satisfaction"
@@ -78,51 +118,98 @@ class ConstraintSatisfactionEvaluator(MandatoryEvaluator):
         Returns:
             (score, detailed_violations)
         """
-        violations = {
-            "allergen_violations": [],
-            "dietary_restriction_violations": [],
-            "meal_distribution_violations": [],
-        }
+        return self.evaluate_batch([meal_plans], constraints, inventory)[0]
 
-        component_scores = {}
+    def evaluate_batch(
+        self,
+        batches: list[list[MealPlan]],
+        constraints: DietaryConstraints,
+        inventory: Inventory,
+    ) -> list[tuple[float, dict[str, Any]]]:
+        """
+        Evaluate several candidate lists of meal plans together.
 
-        # 1. Allergen compliance (CRITICAL - zero tolerance)
-        allergen_violation = self._check_allergen_violations(
-            meal_plans, constraints.allergens or []
+        The meals of all candidates are scanned and scored in one pass, and
+        the results are split back per candidate.
+        """
+        plans = [plan for meal_plans in batches for plan in meal_plans]
+        # Candidate index of every plan, and of every meal in _MEAL_TYPES order
+        plan_batch = np.repeat(
+            np.arange(len(batches)), [len(meal_plans) for meal_plans in batches]
         )
-        if allergen_violation:
-            violations["allergen_violations"].append("Allergen detected in meal plan")
-            component_scores["allergen"] = 0.0
-        else:
-            component_scores["allergen"] = 1.0
+        meal_batch = np.repeat(plan_batch, len(_MEAL_TYPES))
+        corpus = _MealCorpus(plans)
+
+        # 1. Allergen compliance (CRITICAL - zero tolerance)
+        has_allergen = np.zeros(len(batches), dtype=bool)
+        if constraints.allergens:
+            pattern = _allergen_pattern(
+                frozenset(a.lower() for a in constraints.allergens)
+            )
+            has_allergen[meal_batch[corpus.matching_meals(pattern)]] = True
 
         # 2. Dietary restriction compliance
-        restriction_score = self._evaluate_dietary_restrictions(meal_plans, constraints)
-        component_scores["dietary_restrictions"] = restriction_score["score"]
-        violations["dietary_restriction_violations"] = restriction_score["violations"]
+        restriction_violations = self._evaluate_dietary_restrictions(
+            corpus, meal_batch, len(batches), constraints
+        )
 
         # 3. Meal distribution balance (breakfast 25%, lunch 35%, dinner 40%)
-        distribution_score = self._evaluate_meal_distribution(meal_plans)
-        component_scores["meal_distribution"] = distribution_score["score"]
-        violations["meal_distribution_violations"] = distribution_score["violations"]
-
-        # Calculate weighted score (allergen compliance is critical)
-        if component_scores["allergen"] == 0.0:
-            total_score = 0.0  # Immediate fail for allergen violations
-        else:
+        distribution_scores, distribution_violations = self._evaluate_meal_distribution(
+            plans, plan_batch, len(batches)
+        )
+
+        results = []
+        for i in range(len(batches)):
+            violations: dict[str, list[str]] = {
+                "allergen_violations": [],
+                "dietary_restriction_violations": [],
+                "meal_distribution_violations": [],
+            }
+
+            if has_allergen[i]:
+                # Immediate fail; the remaining components cannot change the score
+                violations["allergen_violations"].append(
+                    "Allergen detected in meal plan"
+                )
+                results.append(
+                    (
+                        0.0,
+                        {
+                            "component_scores": {"allergen": 0.0},
+                            "violations": violations,
+                            "total_violations": 1,
+                        },
+                    )
+                )
+                continue
+
+            violations["dietary_restriction_violations"] = restriction_violations[i]
+            violations["meal_distribution_violations"] = distribution_violations[i]
+            component_scores = {
+                "allergen": 1.0,
+                "dietary_restrictions": (
+                    max(0.0, 1.0 - len(restriction_violations[i]) * 0.2)
+                    if restriction_violations[i]
+                    else 1.0
+                ),
+                "meal_distribution": float(distribution_scores[i]),
+            }
+
+            # Calculate weighted score
             total_score = (
                 component_scores["allergen"] * 0.5
                 + component_scores["dietary_restrictions"] * 0.3
                 + component_scores["meal_distribution"] * 0.2
             )
 
-        details = {
-            "component_scores": component_scores,
-            "violations": violations,
-            "total_violations": sum(len(v) for v in violations.values()),
-        }
+            details = {
+                "component_scores": component_scores,
+                "violations": violations,
+                "total_violations": sum(len(v) for v in violations.values()),
+            }
+            results.append((total_score, details))
 
-        return total_score, details
+        return results
 
     def is_critical_failure(
         self,
@@ -133,124 +220,122 @@ class ConstraintSatisfactionEvaluator(MandatoryEvaluator):
         """Check if there are allergen violations (critical failure)."""
         return self._check_allergen_violations(meal_plans, constraints.allergens or [])
 
+    def evaluate_with_failure_check(
+        self,
+        meal_plans: list[MealPlan],
+        constraints: DietaryConstraints,
+        inventory: Inventory,
+    ) -> tuple[float, dict[str, Any], bool]:
+        """Evaluate constraints, reusing the allergen check as the failure check."""
+        return self.evaluate_batch_with_failure_check(
+            [meal_plans], constraints, inventory
+        )[0]
+
+    def evaluate_batch_with_failure_check(
+        self,
+        batches: list[list[MealPlan]],
+        constraints: DietaryConstraints,
+        inventory: Inventory,
+    ) -> list[tuple[float, dict[str, Any], bool]]:
+        """Batch form of evaluate_with_failure_check."""
+        return [
+            (score, details, details["component_scores"]["allergen"] == 0.0)
+            for score, details in self.evaluate_batch(batches, constraints, inventory)
+        ]
+
     def _check_allergen_violations(
-        self, meal_plans: list[MealPlan], allergens: list[str]
+        self, meal_plans: list[MealPlan], allergens: Sequence[str]
     ) -> bool:
         """Check if any allergens appear in the meal plans."""
         if not allergens:
             return False
 
-        for plan in meal_plans:
-            for meal_type in ["breakfast", "lunch", "dinner"]:
-                meal = getattr(plan, meal_type)
-                meal_text = json.dumps(meal).lower()
-
-                for allergen in allergens:
-                    keywords = self.allergen_keywords.get(
-                        allergen.lower(), [allergen.lower()]
-                    )
-                    if any(keyword in meal_text for keyword in keywords):
-                        return True
+        # Scan each meal once for all keywords instead of once per keyword
+        pattern = _allergen_pattern(frozenset(a.lower() for a in allergens))
 
-        return False
+        return any(
+            pattern.search(_meal_text(meal))
+            for plan in meal_plans
+            for meal in (plan.breakfast, plan.lunch, plan.dinner)
+        )
 
     def _evaluate_dietary_restrictions(
-        self, meal_plans: list[MealPlan], constraints: DietaryConstraints
-    ) -> dict[str, Any]:
-        """Evaluate adherence to dietary restrictions."""
-        violations = []
-
-        for restriction in constraints.dietary_restrictions or []:
-            restriction_lower = restriction.lower()
-
-            for plan in meal_plans:
-                for meal_type, meal in [
-                    ("breakfast", plan.breakfast),
-                    ("lunch", plan.lunch),
-                    ("dinner", plan.dinner),
-                ]:
-                    meal_text = json.dumps(meal).lower()
-
-                    if restriction_lower == "vegetarian":
-                        meat_keywords = [
-                            "meat",
-                            "beef",
-                            "pork",
-                            "chicken",
-                            "fish",
-                            "seafood",
-                        ]
-                        if any(keyword in meal_text for keyword in meat_keywords):
-                            violations.append(
-                                f"Vegetarian violation in {meal_type} on day {plan.day}"
-                            )
-
-                    elif restriction_lower == "vegan":
-                        animal_keywords = [
-                            "meat",
-                            "dairy",
-                            "egg",
-                            "milk",
-                            "cheese",
-                            "butter",
-                            "yogurt",
-                        ]
-                        if any(keyword in meal_text for keyword in animal_keywords):
-                            violations.append(
-                                f"Vegan violation in {meal_type} on day {plan.day}"
-                            )
-
-                    elif restriction_lower == "low-carb":
-                        high_carb_keywords = [
-                            "bread",
-                            "rice",
-                            "pasta",
-                            "potato",
-                            "noodle",
-                        ]
-                        if any(keyword in meal_text for keyword in high_carb_keywords):
-                            violations.append(
-                                f"Low-carb violation in {meal_type} on day {plan.day}"
-                            )
-
-        score = 1.0 if not violations else max(0.0, 1.0 - len(violations) * 0.2)
-        return {"score": score, "violations": violations}
-
-    def _evaluate_meal_distribution(self, meal_plans: list[MealPlan]) -> dict[str, Any]:
-        """Evaluate if meals are properly distributed (breakfast 25%, lunch 35%, dinner 40%)."""
-        violations = []
-        distribution_scores = []
-
-        ideal_distribution = [0.25, 0.35, 0.40]  # breakfast, lunch, dinner
-
-        for plan in meal_plans:
-            breakfast_cal = plan.breakfast.get("calories", 0)
-            lunch_cal = plan.lunch.get("calories", 0)
-            dinner_cal = plan.dinner.get("calories", 0)
-            total_cal = breakfast_cal + lunch_cal + dinner_cal
-
-            if total_cal > 0:
-                actual_distribution = [
-                    breakfast_cal / total_cal,
-                    lunch_cal / total_cal,
-                    dinner_cal / total_cal,
-                ]
-                distribution_error = sum(
-                    abs(a - i)
-                    for a, i in zip(
-                        actual_distribution, ideal_distribution, strict=True
-                    )
+        self,
+        corpus: _MealCorpus,
+        meal_batch: np.ndarray,
+        n_batches: int,
+        constraints: DietaryConstraints,
+    ) -> list[list[str]]:
+        """Collect dietary restriction violations for each candidate."""
+        violations: list[list[str]] = [[] for _ in range(n_batches)]
+
+        rules = [
+            _RESTRICTION_RULES[restriction.lower()]
+            for restriction in constraints.dietary_restrictions or []
+            if restriction.lower() in _RESTRICTION_RULES
+        ]
+
+        for label, pattern in rules:
+            for meal_index in corpus.matching_meals(pattern).tolist():
+                plan_index, meal_type = divmod(meal_index, len(_MEAL_TYPES))
+                violations[meal_batch[meal_index]].append(
+                    f"{label} violation in {_MEAL_TYPES[meal_type]} "
+                    f"on day {corpus.plans[plan_index].day}"
                 )
 
-                if distribution_error > 0.2:  # Allow 20% total deviation
-                    violations.append(
-                        f"Poor meal distribution on day {plan.day}: "
-                        f"{[f'{d:.1%}' for d in actual_distribution]}"
-                    )
+        return violations
+
+    def _evaluate_meal_distribution(
+        self, plans: list[MealPlan], plan_batch: np.ndarray, n_batches: int
+    ) -> tuple[np.ndarray, list[list[str]]]:
+        """Score how well meals follow the 25/35/40% split, per candidate.
 
-                distribution_scores.append(1.0 - min(distribution_error, 1.0))
-            else:
-                distribution_scores.append(0.0)
+        Candidates without meal plans score 0.
+        """
+        violations: list[list[str]] = [[] for _ in range(n_batches)]
+
+        ideal_distribution = np.array([0.25, 0.35, 0.40])  # breakfast, lunch, dinner
+
+        calories = np.fromiter(
+            (
+                meal.calories
+                for plan in plans
+                for meal in (plan.breakfast, plan.lunch, plan.dinner)
+            ),
+            dtype=np.float64,
+            count=len(plans) * len(_MEAL_TYPES),
+        ).reshape(len(plans), len(_MEAL_TYPES))
+        totals = calories.sum(axis=1)
+        has_calories = totals > 0
+
+        # Share of each day's calories per meal; days without calories score 0
+        actual_distribution = np.divide(
+            calories,
+            totals[:, None],
+            out=np.zeros_like(calories),
+            where=has_calories[:, None],
+        )
+        distribution_error = np.abs(actual_distribution - ideal_distribution).sum(
+            axis=1
+        )
+        distribution_scores = np.where(
+            has_calories, 1.0 - np.minimum(distribution_error, 1.0), 0.0
+        )
+
+        # Mean day score of each candidate
+        plan_counts = np.bincount(plan_batch, minlength=n_batches)
+        batch_scores = np.divide(
+            np.bincount(plan_batch, weights=distribution_scores, minlength=n_batches),
+            plan_counts,
+            out=np.zeros(n_batches),
+            where=plan_counts > 0,
+        )
+
+        # Allow 20% total deviation
+        for i in np.flatnonzero(has_calories & (distribution_error > 0.2)).tolist():
+            violations[plan_batch[i]].append(
+                f"Poor meal distribution on day {plans[i].day}: "
+                f"{[f'{d:.1%}' for d in actual_distribution[i]]}"
+            )
 
-        avg_score = float(np.mean(distribution_scores)) if distribution_scores else 0.0
-        return {"score": avg_score, "violations": violations}
+        return batch_scores, violations
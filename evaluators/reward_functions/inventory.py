@@ -2,18 +2,53 @@
 Inventory utilization evaluator for nutrition meal plans.
 """
 
-from typing import Any
+import functools
+import re
+from collections import Counter
+from itertools import chain
+from typing import Any, ClassVar
 
 from agents.nutrition_planner import DietaryConstraints, Inventory, MealPlan
 from evaluators.reward_functions.base import MandatoryEvaluator
+from utils.text import keyword_pattern
+
+
+@functools.lru_cache(maxsize=4096)
+def _score_missing_ingredients(
+    missing_ingredients: tuple[str, ...],
+    basic_pattern: re.Pattern[str],
+    specialty_pattern: re.Pattern[str],
+) -> float:
+    """Score lowercased missing ingredient names, favouring basic ones."""
+    if not missing_ingredients:
+        return 1.0
+
+    basic_count = 0
+    specialty_count = 0
+
+    # Plans repeat staples across days, so classify each distinct name once
+    for ingredient, count in Counter(missing_ingredients).items():
+        if basic_pattern.search(ingredient):
+            basic_count += count
+        elif specialty_pattern.search(ingredient):
+            specialty_count += count
+
+    total_missing = len(missing_ingredients)
+    basic_ratio = basic_count / total_missing if total_missing > 0 else 0
+    specialty_penalty = specialty_count * 0.2
+
+    # Score higher for basic ingredients, penalize for specialty ingredients
+    score = max(0.0, basic_ratio - specialty_penalty)
+    return min(1.0, score)
 
 
 class InventoryUtilizationEvaluator(MandatoryEvaluator):
     """Evaluates how efficiently the available inventory is utilized."""
 
-    def __init__(self, weight: float = 1.0):
-        super().__init__(weight)
-        self.basic_ingredients = {
+    # Missing ingredients that are reasonable to buy, and ones that are not;
+    # shared by all instances and compiled once at import
+    basic_ingredients: ClassVar[frozenset[str]] = frozenset(
+        {
             "salt",
             "sugar",
             "oil",
@@ -24,13 +59,20 @@ class InventoryUtilizationEvaluator(MandatoryEvaluator):
             "milk",
             "eggs",
         }
-        self.specialty_ingredients = {
+    )
+    specialty_ingredients: ClassVar[frozenset[str]] = frozenset(
+        {
             "truffle",
             "caviar",
             "wagyu",
             "exotic spices",
             "rare herbs",
         }
+    )
+    _basic_pattern: ClassVar[re.Pattern[str]] = keyword_pattern(basic_ingredients)
+    _specialty_pattern: ClassVar[re.Pattern[str]] = keyword_pattern(
+        specialty_ingredients
+    )
 
     @property
     def name(self) -> str:
@@ -54,27 +96,35 @@ class InventoryUtilizationEvaluator(MandatoryEvaluator):
         """
         # Extract available ingredients
         available_items = {item["name"].lower() for item in inventory.items}
-        used_items = set()
-        all_ingredients = []
-        missing_ingredients = []
 
         # Collect all ingredients used and missing
-        for plan in meal_plans:
-            for meal in [plan.breakfast, plan.lunch, plan.dinner]:
-                ingredients = meal.get("ingredients", [])
-                all_ingredients.extend(ingredients)
-
-                # Check which available ingredients are used
-                for ingredient in ingredients:
-                    ingredient_lower = ingredient.lower()
-                    for available_item in available_items:
-                        if (
-                            available_item in ingredient_lower
-                            or ingredient_lower in available_item
-                        ):
-                            used_items.add(available_item)
-
-            missing_ingredients.extend(plan.missing_ingredients)
+        unique_ingredients = set(
+            chain.from_iterable(
+                meal.ingredients
+                for plan in meal_plans
+                for meal in (plan.breakfast, plan.lunch, plan.dinner)
+            )
+        )
+        missing_ingredients = list(
+            chain.from_iterable(plan.missing_ingredients for plan in meal_plans)
+        )
+
+        # An available item is used when it appears in an ingredient name or
+        # contains one. Exact name matches are found with a set intersection;
+        # only the remaining items need substring checks, where the forward
+        # check searches all distinct ingredients in a single string.
+        distinct_ingredients = {ingredient.lower() for ingredient in unique_ingredients}
+        used_items = available_items & distinct_ingredients
+        ingredients_text = "\n".join(distinct_ingredients)
+        if distinct_ingredients:
+            used_items |= {
+                available_item
+                for available_item in available_items - used_items
+                if available_item in ingredients_text
+                or any(
+                    ingredient in available_item for ingredient in distinct_ingredients
+                )
+            }
 
         # Calculate utilization metrics
         inventory_utilization_rate = (
@@ -85,7 +135,7 @@ class InventoryUtilizationEvaluator(MandatoryEvaluator):
         missing_score = self._evaluate_missing_ingredients_quality(missing_ingredients)
 
         # Calculate ingredient efficiency (avoid excessive ingredient count)
-        avg_ingredients_per_meal = len(set(all_ingredients)) / (len(meal_plans) * 3)
+        avg_ingredients_per_meal = len(unique_ingredients) / (len(meal_plans) * 3)
         efficiency_score = 1.0 if 3 <= avg_ingredients_per_meal <= 8 else 0.7
 
         # Combined score
@@ -121,27 +171,11 @@ class InventoryUtilizationEvaluator(MandatoryEvaluator):
         self, missing_ingredients: list[str]
     ) -> float:
         """Evaluate the reasonableness of missing ingredients."""
-        if not missing_ingredients:
-            return 1.0
-
-        basic_count = 0
-        specialty_count = 0
-
-        for ingredient in missing_ingredients:
-            ingredient_lower = ingredient.lower()
-
-            if any(basic in ingredient_lower for basic in self.basic_ingredients):
-                basic_count += 1
-            elif any(
-                specialty in ingredient_lower
-                for specialty in self.specialty_ingredients
-            ):
-                specialty_count += 1
-
-        total_missing = len(missing_ingredients)
-        basic_ratio = basic_count / total_missing if total_missing > 0 else 0
-        specialty_penalty = specialty_count * 0.2
-
-        # Score higher for basic ingredients, penalize for specialty ingredients
-        score = max(0.0, basic_ratio - specialty_penalty)
-        return min(1.0, score)
+        # The score depends only on which names are missing and how often, so
+        # the sorted names make a cache key shared by plans that miss the same
+        # staples
+        return _score_missing_ingredients(
+            tuple(sorted(ingredient.lower() for ingredient in missing_ingredients)),
+            self._basic_pattern,
+            self._specialty_pattern,
+        )
@@ -1,10 +1,16 @@
-import json
+import asyncio
+import functools
+import operator
+import time
+from collections.abc import AsyncIterator
 from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Any
 
 import numpy as np
+from openai import AsyncOpenAI
 from rich.console import Console
+from rich.progress import Progress
 from rich.table import Table
 
 from agents.base_agent import AgentConfig
@@ -15,16 +21,46 @@ from agents.nutrition_planner import (
     NutritionPlannerAgent,
 )
 from evaluators.evaluator_manager import EvaluatorManager
-from tools.nutrition_calculator import (
-    MealNutrition,
-    NutritionCalculator,
-    NutritionTarget,
-)
+from tools.nutrition_calculator import NutritionTarget
+from utils.serialization import json_dumps, json_loads
 
 console = Console()
 
-
-@dataclass
+# Nutrients scored against the daily targets, and their keys in the totals
+_NUTRIENTS = ("calories", "protein", "fat", "carbs")
+_ACTUAL_NUTRITION_KEYS = (
+    "total_calories",
+    "total_protein_g",
+    "total_fat_g",
+    "total_carbs_g",
+)
+_daily_totals = operator.attrgetter(*_ACTUAL_NUTRITION_KEYS)
+
+
+@functools.lru_cache(maxsize=256)
+def _daily_targets(constraints: DietaryConstraints) -> np.ndarray:
+    """Daily targets for a constraint set, in _NUTRIENTS order (kcal, then grams).
+
+    Cached per constraint set, which scenarios share across models; the array
+    is read-only.
+    """
+    target = NutritionTarget(
+        daily_calories=constraints.daily_calories, pfc_ratio=constraints.pfc_ratio
+    )
+    targets = np.array(
+        [
+            target.daily_calories,
+            target.daily_protein_g,
+            target.daily_fat_g,
+            target.daily_carbs_g,
+        ],
+        dtype=np.float64,
+    )
+    targets.flags.writeable = False
+    return targets
+
+
+@dataclass(slots=True)
 class EvaluationResult:
     scenario_id: str
     model_name: str
@@ -53,46 +89,34 @@ class NutritionEvaluator:
         Returns:
             (score, errors, violations)
         """
-        # Create MealNutrition object from actual nutrition data
-        actual = MealNutrition(
-            meal_name="Daily total",
-            calories=actual_nutrition.get("total_calories", 0),
-            protein_g=actual_nutrition.get("total_protein_g", 0),
-            fat_g=actual_nutrition.get("total_fat_g", 0),
-            carbs_g=actual_nutrition.get("total_carbs_g", 0),
+        # Percentage error of each daily total, in _NUTRIENTS order
+        targets = _daily_targets(target_constraints)
+        actuals = np.array(
+            [actual_nutrition.get(key, 0) for key in _ACTUAL_NUTRITION_KEYS],
+            dtype=np.float64,
         )
-
-        # Create NutritionTarget from constraints
-        target = NutritionTarget(
-            daily_calories=target_constraints.daily_calories,
-            pfc_ratio=target_constraints.pfc_ratio,
+        # Nutrients with no target (e.g. a 0% macro) are not scored
+        errors_arr = np.divide(
+            np.abs(actuals - targets) * 100,
+            targets,
+            out=np.zeros_like(targets),
+            where=targets > 0,
         )
 
-        # Use NutritionCalculator to calculate errors and check constraints
-        calculator = NutritionCalculator()
-        errors_raw = calculator.calculate_nutrition_error(actual, target)
-        _, violations = calculator.check_nutrition_constraints(
-            actual, target, self.tolerance_pct
+        errors = dict(zip(_NUTRIENTS, errors_arr.tolist(), strict=True))
+        violations = [
+            f"{nutrient.capitalize()} off by {error:.1f}%"
+            for nutrient, error in errors.items()
+            if error > self.tolerance_pct
+        ]
+
+        # Calculate overall nutrition score (0.0 to 1.0): perfect within
+        # tolerance, then a linear decrease to 0.0 at tolerance + 40%
+        max_error = float(errors_arr.max())
+        nutrition_score = float(
+            np.clip(1 - (max_error - self.tolerance_pct) / 40, 0.0, 1.0)
         )
 
-        # Convert error keys to match existing format
-        errors = {
-            "calories": errors_raw["calories_error"],
-            "protein": errors_raw["protein_error"],
-            "fat": errors_raw["fat_error"],
-            "carbs": errors_raw["carbs_error"],
-        }
-
-        # Calculate overall nutrition score (0.0 to 1.0)
-        max_error = max(errors.values()) if errors else 0
-        if max_error <= self.tolerance_pct:
-            nutrition_score = 1.0  # Perfect score
-        else:
-            # Linear decrease from 1.0 to 0.0 as error increases from 10% to 50%
-            nutrition_score = max(
-                0.0, 1.0 * (1 - (max_error - self.tolerance_pct) / 40)
-            )
-
         return nutrition_score, errors, violations
 
     def calculate_constraint_satisfaction_score(
@@ -165,72 +189,107 @@ class NutritionEvaluator:
         )
 
     async def evaluate_scenario(
-        self, scenario_path: Path, agent_config: AgentConfig, days: int = 3
+        self,
+        scenario_path: Path,
+        agent_config: AgentConfig,
+        days: int = 3,
+        client: AsyncOpenAI | None = None,
     ) -> EvaluationResult:
         """
         Evaluate a single scenario.
-        """
-        import time
 
+        Pass ``client`` to reuse an existing OpenAI connection pool; it is left
+        open for the caller.
+        """
         start_time = time.time()
 
-        # Load scenario data
-        with open(scenario_path) as f:
-            scenario_data = json.load(f)
-
-        scenario_id = scenario_data["id"]
-        inventory = Inventory(items=scenario_data["inventory"])
-        constraints = DietaryConstraints(**scenario_data["constraints"])
+        scenario_id, inventory, constraints = await asyncio.to_thread(
+            self._load_scenario, scenario_path
+        )
 
         # Create agent and generate meal plan
-        agent = NutritionPlannerAgent(agent_config)
+        agent = NutritionPlannerAgent(agent_config, client)
 
         try:
             meal_plans = await agent.generate_meal_plan(inventory, constraints, days)
+        except Exception as e:
+            return self._failed_result(scenario_id, agent_config, e, start_time)
+        finally:
+            await agent.aclose()
+
+        return self._score_meal_plans(
+            scenario_id, agent_config, meal_plans, constraints, inventory, start_time
+        )
+
+    @staticmethod
+    @functools.lru_cache(maxsize=256)
+    def _load_scenario(
+        scenario_path: Path,
+    ) -> tuple[str, Inventory, DietaryConstraints]:
+        """Load a scenario file into its id, inventory and constraints.
 
+        Parsed once per path and shared by every model evaluated on it; the
+        returned records are immutable.
+        """
+        scenario_data = json_loads(scenario_path.read_bytes())
+
+        return (
+            scenario_data["id"],
+            Inventory(items=scenario_data["inventory"]),
+            DietaryConstraints(**scenario_data["constraints"]),
+        )
+
+    def _score_meal_plans(
+        self,
+        scenario_id: str,
+        agent_config: AgentConfig,
+        meal_plans: list[MealPlan],
+        constraints: DietaryConstraints,
+        inventory: Inventory,
+        start_time: float,
+    ) -> EvaluationResult:
+        """Score generated meal plans against a scenario."""
+        try:
             # Extract nutrition info (simplified - in production would parse actual output)
-            daily_nutrition = {
-                "total_calories": sum(
-                    plan.daily_nutrition["total_calories"] for plan in meal_plans
-                )
-                / len(meal_plans),
-                "total_protein_g": sum(
-                    plan.daily_nutrition["total_protein_g"] for plan in meal_plans
-                )
-                / len(meal_plans),
-                "total_fat_g": sum(
-                    plan.daily_nutrition["total_fat_g"] for plan in meal_plans
-                )
-                / len(meal_plans),
-                "total_carbs_g": sum(
-                    plan.daily_nutrition["total_carbs_g"] for plan in meal_plans
-                )
-                / len(meal_plans),
-            }
+            if not meal_plans:
+                raise ValueError("No meal plans to score")
+            totals = np.fromiter(
+                (
+                    value
+                    for plan in meal_plans
+                    for value in _daily_totals(plan.daily_nutrition)
+                ),
+                dtype=np.float64,
+                count=len(meal_plans) * len(_ACTUAL_NUTRITION_KEYS),
+            ).reshape(len(meal_plans), -1)
+            daily_nutrition = dict(
+                zip(_ACTUAL_NUTRITION_KEYS, totals.mean(axis=0).tolist(), strict=True)
+            )
 
             # Calculate all evaluation scores
             nutrition_score, nutrition_errors, nutrition_violations = (
                 self.calculate_nutrition_score(daily_nutrition, constraints)
             )
 
-            # Check for critical failures first
-            has_critical_failure, critical_failure_msgs = (
-                self.evaluator_manager.check_critical_failures(
-                    meal_plans, constraints, inventory
-                )
+            # Mandatory evaluations and critical failures, in one pass
+            mandatory = self.evaluator_manager.evaluate_mandatory(
+                meal_plans, constraints, inventory
             )
-
-            # Calculate new mandatory evaluations
-            constraint_satisfaction_score, detailed_violations = (
-                self.calculate_constraint_satisfaction_score(
-                    meal_plans, constraints, inventory
-                )
+            critical_failure_msgs = [
+                f"Critical failure in {name}"
+                for name, (_, _, is_critical) in mandatory.items()
+                if is_critical
+            ]
+            has_critical_failure = bool(critical_failure_msgs)
+
+            constraint_satisfaction_score, constraint_details, _ = mandatory.get(
+                "constraint_satisfaction",
+                (0.0, {"error": "Constraint satisfaction evaluator not found"}, False),
             )
+            detailed_violations = constraint_details.get("violations", {})
 
-            inventory_utilization_score, inventory_details = (
-                self.calculate_inventory_utilization_score(
-                    meal_plans, constraints, inventory
-                )
+            inventory_utilization_score, _, _ = mandatory.get(
+                "inventory_utilization", (0.0, {}, False)
             )
 
             # Calculate extensible quality scores
@@ -270,34 +329,81 @@ class NutritionEvaluator:
             )
 
         except Exception as e:
-            execution_time = time.time() - start_time
-            console.print(f"[red]Error evaluating scenario {scenario_id}: {e}[/red]")
-
-            return EvaluationResult(
-                scenario_id=scenario_id,
-                model_name=agent_config.model_name,
-                score=0.0,
-                nutrition_score=0.0,
-                violations=[f"Execution error: {str(e)}"],
-                execution_time=execution_time,
-                nutrition_errors={},
-                constraint_satisfaction_score=0.0,
-                inventory_utilization_score=0.0,
-                quality_scores={},
-                detailed_violations={},
-            )
+            return self._failed_result(scenario_id, agent_config, e, start_time)
+
+    @staticmethod
+    def _failed_result(
+        scenario_id: str,
+        agent_config: AgentConfig,
+        error: Exception,
+        start_time: float,
+    ) -> EvaluationResult:
+        """Build a zero-score result for a scenario that could not be evaluated."""
+        execution_time = time.time() - start_time
+        console.print(f"[red]Error evaluating scenario {scenario_id}: {error}[/red]")
+
+        return EvaluationResult(
+            scenario_id=scenario_id,
+            model_name=agent_config.model_name,
+            score=0.0,
+            nutrition_score=0.0,
+            violations=[f"Execution error: {str(error)}"],
+            execution_time=execution_time,
+            nutrition_errors={},
+            constraint_satisfaction_score=0.0,
+            inventory_utilization_score=0.0,
+            quality_scores={},
+            detailed_violations={},
+        )
 
     async def evaluate_all_scenarios(
         self,
         scenarios_dir: Path,
         model_configs: list[tuple[str, AgentConfig]],
         days: int = 3,
+        max_concurrency: int = 8,
     ) -> list[EvaluationResult]:
         """
         Evaluate all scenarios with all models.
+
+        Runs are I/O-bound, so up to ``max_concurrency`` of them are in flight
+        at once. Models configured with ``use_batch_api`` instead submit all
+        scenarios as one Batch API job. Results are returned grouped by model,
+        in scenario order; use iter_results to consume them as they finish.
         """
-        results = []
+        results: dict[int, EvaluationResult] = {}
+        async for index, result in self._iter_indexed_results(
+            scenarios_dir, model_configs, days, max_concurrency
+        ):
+            results[index] = result
+        return [results[index] for index in sorted(results)]
+
+    async def iter_results(
+        self,
+        scenarios_dir: Path,
+        model_configs: list[tuple[str, AgentConfig]],
+        days: int = 3,
+        max_concurrency: int = 8,
+    ) -> AsyncIterator[EvaluationResult]:
+        """
+        Evaluate all scenarios with all models, yielding results as they finish.
+
+        Same runs as evaluate_all_scenarios, in completion order. Closing the
+        iterator early cancels the runs still in flight.
+        """
+        async for _, result in self._iter_indexed_results(
+            scenarios_dir, model_configs, days, max_concurrency
+        ):
+            yield result
 
+    async def _iter_indexed_results(
+        self,
+        scenarios_dir: Path,
+        model_configs: list[tuple[str, AgentConfig]],
+        days: int,
+        max_concurrency: int,
+    ) -> AsyncIterator[tuple[int, EvaluationResult]]:
+        """Yield (position in model-major scenario order, result) as runs finish."""
         # Get all scenario files
         scenario_files = list(scenarios_dir.glob("*.json"))
 
@@ -305,14 +411,105 @@ class NutritionEvaluator:
             f"[blue]Evaluating {len(scenario_files)} scenarios with {len(model_configs)} models[/blue]"
         )
 
-        for model_name, config in model_configs:
-            console.print(f"\n[yellow]Testing model: {model_name}[/yellow]")
+        semaphore = asyncio.Semaphore(max_concurrency)
+        # One connection pool for every scenario and model in the run
+        client = NutritionPlannerAgent.create_shared_client()
 
-            for scenario_file in scenario_files:
-                console.print(f"  Running scenario: {scenario_file.stem}")
-                result = await self.evaluate_scenario(scenario_file, config, days)
-                results.append(result)
+        async def run_one(
+            index: int, scenario_file: Path, config: AgentConfig
+        ) -> list[tuple[int, EvaluationResult]]:
+            async with semaphore:
+                result = await self.evaluate_scenario(
+                    scenario_file, config, days, client
+                )
+            return [(index, result)]
+
+        async def run_batch(
+            offset: int, config: AgentConfig
+        ) -> list[tuple[int, EvaluationResult]]:
+            results = await self._evaluate_batch(scenario_files, config, days, client)
+            return list(enumerate(results, offset))
+
+        runs = []
+        for model_index, (_, config) in enumerate(model_configs):
+            offset = model_index * len(scenario_files)
+            if config.use_batch_api:
+                runs.append(run_batch(offset, config))
+            else:
+                runs.extend(
+                    run_one(offset + i, scenario_file, config)
+                    for i, scenario_file in enumerate(scenario_files)
+                )
+        tasks = [asyncio.ensure_future(run) for run in runs]
 
+        try:
+            # One progress bar for the whole sweep instead of a line per run
+            with Progress(console=console) as progress:
+                bar = progress.add_task(
+                    "Scenarios", total=len(scenario_files) * len(model_configs)
+                )
+                for finished in asyncio.as_completed(tasks):
+                    indexed_results = await finished
+                    progress.advance(bar, len(indexed_results))
+                    for indexed_result in indexed_results:
+                        yield indexed_result
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await client.close()
+
+    async def _evaluate_batch(
+        self,
+        scenario_files: list[Path],
+        agent_config: AgentConfig,
+        days: int,
+        client: AsyncOpenAI | None = None,
+    ) -> list[EvaluationResult]:
+        """Evaluate all scenarios for one model through a single batch job."""
+        start_time = time.time()
+        scenarios = await asyncio.gather(
+            *(asyncio.to_thread(self._load_scenario, f) for f in scenario_files)
+        )
+
+        console.print(
+            f"  Submitting {len(scenarios)} scenarios as a batch ([yellow]{agent_config.model_name}[/yellow])"
+        )
+        agent = NutritionPlannerAgent(agent_config, client)
+        try:
+            meal_plans = await agent.generate_meal_plans_batch(
+                {
+                    scenario_id: (inventory, constraints)
+                    for scenario_id, inventory, constraints in scenarios
+                },
+                days,
+            )
+        except Exception as e:
+            return [
+                self._failed_result(scenario_id, agent_config, e, start_time)
+                for scenario_id, _, _ in scenarios
+            ]
+        finally:
+            await agent.aclose()
+
+        results = []
+        for scenario_id, inventory, constraints in scenarios:
+            if scenario_id not in meal_plans:
+                error = ValueError("No valid meal plan in batch output")
+                results.append(
+                    self._failed_result(scenario_id, agent_config, error, start_time)
+                )
+                continue
+            results.append(
+                self._score_meal_plans(
+                    scenario_id,
+                    agent_config,
+                    meal_plans[scenario_id],
+                    constraints,
+                    inventory,
+                    start_time,
+                )
+            )
         return results
 
     def display_results(self, results: list[EvaluationResult]) -> None:
@@ -337,41 +534,51 @@ class NutritionEvaluator:
         summary_table.add_column("Allergen Violations", justify="right")
         summary_table.add_column("Avg Time (s)", justify="right")
 
-        for model_name, model_results in models.items():
-            avg_score = np.mean([r.score for r in model_results])
-            avg_nutrition = np.mean([r.nutrition_score for r in model_results])
-            avg_constraints = np.mean(
-                [r.constraint_satisfaction_score for r in model_results]
-            )
-            avg_inventory = np.mean(
-                [r.inventory_utilization_score for r in model_results]
-            )
-
-            # Calculate average quality score
-            quality_scores = []
-            for result in model_results:
-                if result.quality_scores:
-                    quality_scores.append(np.mean(list(result.quality_scores.values())))
-                else:
-                    quality_scores.append(0.0)
-            avg_quality = np.mean(quality_scores)
+        # One row per result, grouped by model: total, nutrition, constraints,
+        # inventory, quality (mean of the quality metrics) and execution time
+        metrics = np.array(
+            [
+                (
+                    r.score,
+                    r.nutrition_score,
+                    r.constraint_satisfaction_score,
+                    r.inventory_utilization_score,
+                    np.mean(list(r.quality_scores.values()))
+                    if r.quality_scores
+                    else 0.0,
+                    r.execution_time,
+                )
+                for model_results in models.values()
+                for r in model_results
+            ],
+            dtype=np.float64,
+        ).reshape(-1, 6)
+        counts = np.fromiter(
+            (len(model_results) for model_results in models.values()),
+            dtype=np.intp,
+            count=len(models),
+        )
+        starts = np.cumsum(counts) - counts
 
-            avg_time = np.mean([r.execution_time for r in model_results])
+        # Per-model means of every column in a single reduction
+        if models:
+            averages = np.add.reduceat(metrics, starts, axis=0) / counts[:, None]
+        else:
+            averages = np.empty((0, metrics.shape[1]))
 
+        for model_name, (*avg_scores, avg_time) in zip(models, averages, strict=True):
             summary_table.add_row(
                 model_name,
-                f"{avg_score:.3f}",
-                f"{avg_nutrition:.3f}",
-                f"{avg_constraints:.3f}",
-                f"{avg_inventory:.3f}",
-                f"{avg_quality:.3f}",
+                *(f"{avg:.3f}" for avg in avg_scores),
                 f"{avg_time:.1f}",
             )
 
         console.print(summary_table)
 
         # Detailed results by scenario
-        for model_name, model_results in models.items():
+        for (model_name, model_results), start in zip(
+            models.items(), starts, strict=True
+        ):
             console.print(f"\n[bold]{model_name} - Detailed Results[/bold]")
 
             detail_table = Table()
@@ -383,12 +590,11 @@ class NutritionEvaluator:
             detail_table.add_column("Quality", justify="right")
             detail_table.add_column("Key Violations", style="red")
 
-            for result in model_results:
-                # Calculate average quality score for this result
-                if result.quality_scores:
-                    quality_avg = np.mean(list(result.quality_scores.values()))
-                else:
-                    quality_avg = 0.0
+            model_metrics = metrics[start : start + len(model_results)]
+            for result, result_metrics in zip(
+                model_results, model_metrics, strict=True
+            ):
+                quality_avg = result_metrics[4]
 
                 # Show key violations (first 2)
                 violations_text = "; ".join(
@@ -432,11 +638,12 @@ class NutritionEvaluator:
                 }
             )
 
-        with open(output_path, "w") as f:
-            json.dump(
+        output_path.write_text(
+            json_dumps(
                 {"evaluation_timestamp": "2025-06-20", "results": serializable_results},
-                f,
-                indent=2,
-            )
+                pretty=True,
+            ),
+            encoding="utf-8",
+        )
 
         console.print(f"[green]Results saved to {output_path}[/green]")
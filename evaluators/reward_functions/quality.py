@@ -8,6 +8,10 @@ import numpy as np
 
 from agents.nutrition_planner import DietaryConstraints, Inventory, MealPlan
 from evaluators.reward_functions.base import QualityEvaluator
+from tools.nutrition_calculator import macro_calories
+
+# Meal types in the order the meals are stored on a MealPlan
+_MEAL_TYPES = ("breakfast", "lunch", "dinner")
 
 
 class DiversityEvaluator(QualityEvaluator):
@@ -30,17 +34,17 @@ class DiversityEvaluator(QualityEvaluator):
         inventory: Inventory,
     ) -> tuple[float, dict[str, Any]]:
         """Evaluate ingredient and cooking method diversity."""
-        all_ingredients = []
+        all_ingredients: list[str] = []
         cooking_methods = []
         protein_sources = []
 
         for plan in meal_plans:
-            for meal in [plan.breakfast, plan.lunch, plan.dinner]:
-                ingredients = meal.get("ingredients", [])
+            for meal in (plan.breakfast, plan.lunch, plan.dinner):
+                ingredients = meal.ingredients
                 all_ingredients.extend(ingredients)
 
                 # Extract cooking methods from instructions
-                instructions = meal.get("cooking_instructions", "").lower()
+                instructions = meal.cooking_instructions.lower()
                 if any(
                     word in instructions
                     for word in [
@@ -154,13 +158,11 @@ class FeasibilityEvaluator(QualityEvaluator):
 
         for plan in meal_plans:
             day_scores = []
-            for meal_type, meal in [
-                ("breakfast", plan.breakfast),
-                ("lunch", plan.lunch),
-                ("dinner", plan.dinner),
-            ]:
+            for meal_type, meal in zip(
+                _MEAL_TYPES, (plan.breakfast, plan.lunch, plan.dinner), strict=True
+            ):
                 # Evaluate complexity based on cooking instructions
-                instructions = meal.get("cooking_instructions", "")
+                instructions = meal.cooking_instructions
                 complexity = self._calculate_cooking_complexity(instructions)
 
                 # Breakfast should be simpler
@@ -170,7 +172,7 @@ class FeasibilityEvaluator(QualityEvaluator):
                     complexity_score = 1.0 if complexity <= 5 else 0.8
 
                 # Ingredient count should be reasonable (3-8 ingredients)
-                ingredient_count = len(meal.get("ingredients", []))
+                ingredient_count = len(meal.ingredients)
                 ingredient_score = 1.0 if 3 <= ingredient_count <= 8 else 0.7
 
                 # Time estimation based on instructions
@@ -345,30 +347,27 @@ class NutritionalBalanceEvaluator(QualityEvaluator):
         inventory: Inventory,
     ) -> tuple[float, dict[str, Any]]:
         """Evaluate nutritional balance and consistency."""
-        daily_calories = []
-        daily_protein_ratios = []
-        daily_fat_ratios = []
-        daily_carb_ratios = []
-
-        for plan in meal_plans:
-            total_calories = plan.daily_nutrition.get("total_calories", 0)
-            total_protein = plan.daily_nutrition.get("total_protein_g", 0)
-            total_fat = plan.daily_nutrition.get("total_fat_g", 0)
-            total_carbs = plan.daily_nutrition.get("total_carbs_g", 0)
-
-            daily_calories.append(total_calories)
-
-            # Calculate PFC ratios
-            if total_calories > 0:
-                protein_cal = total_protein * 4
-                fat_cal = total_fat * 9
-                carb_cal = total_carbs * 4
-                total_macro_cal = protein_cal + fat_cal + carb_cal
-
-                if total_macro_cal > 0:
-                    daily_protein_ratios.append(protein_cal / total_macro_cal)
-                    daily_fat_ratios.append(fat_cal / total_macro_cal)
-                    daily_carb_ratios.append(carb_cal / total_macro_cal)
+        daily_calories = [plan.daily_nutrition.total_calories for plan in meal_plans]
+
+        # Calculate PFC ratios for all days at once
+        macros_g = np.array(
+            [
+                (
+                    plan.daily_nutrition.total_protein_g,
+                    plan.daily_nutrition.total_fat_g,
+                    plan.daily_nutrition.total_carbs_g,
+                )
+                for plan in meal_plans
+            ],
+            dtype=np.float64,
+        ).reshape(-1, 3)
+        macro_cal = macro_calories(macros_g)
+        total_macro_cal = macro_cal.sum(axis=1)
+        valid = (np.asarray(daily_calories) > 0) & (total_macro_cal > 0)
+        ratios = macro_cal[valid] / total_macro_cal[valid, np.newaxis]
+        daily_protein_ratios = ratios[:, 0].tolist()
+        daily_fat_ratios = ratios[:, 1].tolist()
+        daily_carb_ratios = ratios[:, 2].tolist()
 
         # Calculate consistency scores
         calorie_consistency = self._calculate_consistency_score(daily_calories)
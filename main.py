@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 import asyncio
 import json
+from dataclasses import asdict
 from pathlib import Path
 from typing import Any
 
@@ -228,11 +229,11 @@ def save_meal_plan(meal_plans: list[Any], filename: str) -> None:
             {
                 "day": plan.day,
                 "meals": {
-                    "breakfast": plan.breakfast,
-                    "lunch": plan.lunch,
-                    "dinner": plan.dinner,
+                    "breakfast": asdict(plan.breakfast),
+                    "lunch": asdict(plan.lunch),
+                    "dinner": asdict(plan.dinner),
                 },
-                "daily_nutrition": plan.daily_nutrition,
+                "daily_nutrition": asdict(plan.daily_nutrition),
                 "missing_ingredients": plan.missing_ingredients,
             }
             for plan in meal_plans
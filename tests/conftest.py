@@ -0,0 +1,13 @@
+import pytest
+
+import tools.cache
+from tools.cache import DiskCache
+
+
+@pytest.fixture
+def disk_cache(tmp_path, monkeypatch):
+    """一時ディレクトリの DiskCache を既定のキャッシュとして使う"""
+    cache = DiskCache(tmp_path / "cache.sqlite3")
+    monkeypatch.setattr(tools.cache, "default_cache", cache)
+    yield cache
+    cache.close()
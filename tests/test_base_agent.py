@@ -0,0 +1,217 @@
+"""
+BaseAgent のオフラインテスト
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from openai import AsyncOpenAI
+
+from agents.base_agent import (
+    AgentConfig,
+    BaseAgent,
+    FatalToolError,
+    ModelProvider,
+    RunState,
+    ToolCall,
+)
+
+
+def make_config(**overrides) -> AgentConfig:
+    return AgentConfig(ModelProvider.OPENAI, "gpt-4o-mini", verbose=False, **overrides)
+
+
+def test_rate_limiters_are_shared_per_client():
+    """同じクライアントを使うエージェントは同じレート制限を共有する"""
+    client = AsyncOpenAI(api_key="test")
+    config = make_config(rpm=60, tpm=10_000)
+    first, second = BaseAgent(config, client), BaseAgent(config, client)
+    assert first._rpm_limiter is second._rpm_limiter
+    assert first._tpm_limiter is second._tpm_limiter
+
+    other = BaseAgent(config, AsyncOpenAI(api_key="test"))
+    assert other._rpm_limiter is not first._rpm_limiter
+
+
+def test_rate_limiters_are_separate_per_model():
+    """モデルごとに別のレート制限を使う"""
+    client = AsyncOpenAI(api_key="test")
+    mini = BaseAgent(make_config(rpm=60), client)
+    full = BaseAgent(
+        AgentConfig(ModelProvider.OPENAI, "gpt-4o", rpm=60, verbose=False), client
+    )
+    assert mini._rpm_limiter is not full._rpm_limiter
+
+
+async def test_tool_concurrency_is_shared_across_agents():
+    """ツールの同時実行数の上限はエージェント間で共有される"""
+    running = 0
+    peak = 0
+
+    async def slow_tool() -> str:
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return "done"
+
+    client = AsyncOpenAI(api_key="test")
+    agents = [BaseAgent(make_config(max_tool_concurrency=2), client) for _ in range(3)]
+    for agent in agents:
+        agent.register_tool("slow", slow_tool, "Slow tool", {"type": "object"})
+
+    results = await asyncio.gather(
+        *(
+            agent._execute_single_tool(ToolCall("slow", {}, f"call_{i}"))
+            for i, agent in enumerate(agents * 2)
+        )
+    )
+    assert all(result.output == "done" for result in results)
+    assert peak == 2
+
+
+def tool_delta(index, call_id=None, name=None, arguments=None):
+    return SimpleNamespace(
+        index=index,
+        id=call_id,
+        function=SimpleNamespace(name=name, arguments=arguments),
+    )
+
+
+def stream_chunk(content=None, tool_calls=None):
+    delta = SimpleNamespace(content=content, tool_calls=tool_calls)
+    return SimpleNamespace(choices=[SimpleNamespace(delta=delta)])
+
+
+class FakeStream:
+    """ストリーミング応答のチャンクを一つずつ返す"""
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.finished = False
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for chunk in self.chunks:
+            # 他のタスク(先に開始したツール)に実行の機会を与える
+            await asyncio.sleep(0)
+            yield chunk
+        self.finished = True
+
+
+def use_streams(agent, streams):
+    """エージェントの OpenAI リクエストを用意したストリームに差し替える"""
+    pending = iter(streams)
+
+    async def send(messages):
+        return next(pending)
+
+    agent._send_openai_request = send
+
+
+def two_tool_call_stream(second_arguments='{"x": 2}'):
+    # 引数は複数のチャンクに分割されて届く
+    return FakeStream(
+        [
+            stream_chunk(tool_calls=[tool_delta(0, "call_a", "echo", '{"x"')]),
+            stream_chunk(tool_calls=[tool_delta(0, arguments=": 1}")]),
+            stream_chunk(tool_calls=[tool_delta(1, "call_b", "ec")]),
+            stream_chunk(tool_calls=[tool_delta(1, name="ho")]),
+            stream_chunk(tool_calls=[tool_delta(1, arguments=second_arguments[:3])]),
+            stream_chunk(tool_calls=[tool_delta(1, arguments=second_arguments[3:])]),
+        ]
+    )
+
+
+def final_stream(content="finished"):
+    return FakeStream([stream_chunk(content=content[:3]), stream_chunk(content[3:])])
+
+
+async def test_stream_reassembles_tool_call_fragments():
+    """インデックスごとに分割されたツール呼び出しを組み立て直す"""
+    agent = BaseAgent(make_config(), AsyncOpenAI(api_key="test"))
+    use_streams(agent, [two_tool_call_stream()])
+    started = []
+
+    response = await agent._get_openai_response(
+        RunState(messages=[]), started.append
+    )
+
+    assert [(tc.id, tc.name, tc.arguments) for tc in response["tool_calls"]] == [
+        ("call_a", "echo", {"x": 1}),
+        ("call_b", "echo", {"x": 2}),
+    ]
+    assert [tc.id for tc in started] == ["call_a", "call_b"]
+    raw_calls = response["raw_message"]["tool_calls"]
+    assert [raw["function"]["arguments"] for raw in raw_calls] == [
+        '{"x": 1}',
+        '{"x": 2}',
+    ]
+
+
+async def test_tools_start_once_while_streaming():
+    """各ツールは一度だけ実行され、最初の呼び出しはストリーム終了前に始まる"""
+    agent = BaseAgent(make_config(), AsyncOpenAI(api_key="test"))
+    stream = two_tool_call_stream()
+    calls = []
+
+    async def echo(x: int) -> int:
+        calls.append((x, stream.finished))
+        return x
+
+    agent.register_tool("echo", echo, "Echo", {"type": "object"})
+    use_streams(agent, [stream, final_stream()])
+
+    assert await agent.run("go") == "finished"
+    assert sorted(x for x, _ in calls) == [1, 2]
+    assert dict(calls)[1] is False
+    tool_messages = [m for m in agent.messages if m["role"] == "tool"]
+    assert [m["tool_call_id"] for m in tool_messages] == ["call_a", "call_b"]
+
+
+async def test_deduplicated_calls_keep_their_own_ids():
+    """重複したツール呼び出しは一度だけ実行され、結果は各 ID に返される"""
+    agent = BaseAgent(make_config(dedup_tool_calls=True), AsyncOpenAI(api_key="test"))
+    calls = []
+
+    async def echo(x: int) -> int:
+        calls.append(x)
+        return x
+
+    agent.register_tool("echo", echo, "Echo", {"type": "object"})
+    use_streams(agent, [two_tool_call_stream('{"x": 1}'), final_stream()])
+
+    await agent.run("go")
+    assert calls == [1]
+    tool_messages = [m for m in agent.messages if m["role"] == "tool"]
+    assert [(m["tool_call_id"], m["content"]) for m in tool_messages] == [
+        ("call_a", "1"),
+        ("call_b", "1"),
+    ]
+
+
+async def test_fatal_tool_error_cancels_sibling_calls():
+    """FatalToolError は同じイテレーションの他のツールをキャンセルする"""
+    agent = BaseAgent(make_config(), AsyncOpenAI(api_key="test"))
+    cancelled = asyncio.Event()
+
+    async def echo(x: int) -> int:
+        if x == 2:
+            raise FatalToolError("stop")
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+        return x
+
+    agent.register_tool("echo", echo, "Echo", {"type": "object"})
+    use_streams(agent, [two_tool_call_stream(), final_stream()])
+
+    with pytest.raises(FatalToolError):
+        await agent.run("go")
+    assert cancelled.is_set()
@@ -0,0 +1,134 @@
+"""
+永続キャッシュ (tools.cache) のテスト
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+import tools.cache
+from tools.cache import DiskCache, disk_memoize
+from tools.fatsecret_tool import _food_query_key, _recipe_query_key
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """tools.cache が参照する時刻を手動で進める"""
+    now = SimpleNamespace(value=1_000_000.0)
+    monkeypatch.setattr(
+        tools.cache, "time", SimpleNamespace(time=lambda: now.value)
+    )
+    return now
+
+
+def counting_lookup(cache, expire=60.0):
+    """呼び出し回数を数える非同期関数を disk_memoize でラップする"""
+    calls = []
+
+    @disk_memoize(_food_query_key, cache=cache, expire=expire)
+    async def lookup(food_name: str) -> dict:
+        calls.append(food_name)
+        return {"food": food_name.strip().lower(), "call": len(calls)}
+
+    return lookup, calls
+
+
+def test_disk_cache_round_trip_and_expiry(tmp_path, clock):
+    """保存した値は期限まで取得でき、期限後は None になる"""
+    cache = DiskCache(tmp_path / "cache.sqlite3")
+    cache.set("key", {"foods": [1, 2]}, expire=10)
+    assert cache.get("key") == {"foods": [1, 2]}
+
+    clock.value += 11
+    assert cache.get("key") is None
+    cache.close()
+
+
+def test_disk_cache_persists_across_connections(tmp_path):
+    """別の接続(次回の実行)からも保存した値を読める"""
+    path = tmp_path / "cache.sqlite3"
+    first = DiskCache(path)
+    first.set("key", "value")
+    first.close()
+
+    second = DiskCache(path)
+    assert second.get("key") == "value"
+    second.close()
+
+
+def test_disk_cache_creates_missing_directory(tmp_path):
+    """既定のユーザーキャッシュディレクトリがまだなくても作成して保存する"""
+    cache = DiskCache(tmp_path / "nutrition-agent" / "tools.sqlite3")
+    cache.set("key", "value")
+    assert cache.get("key") == "value"
+    cache.close()
+
+
+async def test_memoize_serves_memory_then_disk(disk_cache):
+    """同じクエリはメモリから、メモリを消した後はディスクから返す"""
+    lookup, calls = counting_lookup(disk_cache)
+
+    first = await lookup("Rice")
+    assert await lookup("Rice") == first
+    assert calls == ["Rice"]
+
+    lookup.cache_clear()
+    assert await lookup("Rice") == first
+    assert calls == ["Rice"]
+
+
+async def test_memoize_normalizes_keys(disk_cache):
+    """大文字小文字や前後の空白が違うだけのクエリは同じエントリを使う"""
+    lookup, calls = counting_lookup(disk_cache)
+
+    await lookup("Rice")
+    await lookup("  rice ")
+    await lookup("RICE")
+    assert calls == ["Rice"]
+
+    await lookup("brown rice")
+    assert calls == ["Rice", "brown rice"]
+
+
+async def test_memoize_refreshes_expired_entries(disk_cache, clock):
+    """期限切れのエントリはメモリ・ディスクとも使わずに再計算する"""
+    lookup, calls = counting_lookup(disk_cache, expire=10)
+
+    await lookup("rice")
+    clock.value += 11
+    refreshed = await lookup("rice")
+    assert calls == ["rice", "rice"]
+    assert refreshed["call"] == 2
+
+
+async def test_memoize_does_not_store_failures(disk_cache):
+    """例外を送出した呼び出しは保存しない"""
+    calls = []
+
+    @disk_memoize(_food_query_key, cache=disk_cache)
+    async def flaky(food_name: str) -> str:
+        calls.append(food_name)
+        if len(calls) == 1:
+            raise RuntimeError("temporary failure")
+        return "ok"
+
+    with pytest.raises(RuntimeError):
+        await flaky("rice")
+    assert await flaky("rice") == "ok"
+    assert len(calls) == 2
+
+
+def test_food_query_key_normalizes_case_and_whitespace():
+    assert _food_query_key("  Chicken Breast ") == _food_query_key("chicken breast")
+
+
+def test_recipe_query_key_ignores_order_and_case():
+    """材料や制限の順序が違っても同じキーになる"""
+    assert _recipe_query_key(["Rice", " egg"], ["Vegan", "low-carb"]) == (
+        _recipe_query_key(["egg", "rice"], ["low-carb", "vegan"])
+    )
+    assert _recipe_query_key(["rice"]) == _recipe_query_key(["rice"], [])
+    assert _recipe_query_key(["rice"]) != _recipe_query_key(["rice", "egg"])
+    assert _recipe_query_key(["rice"], ["vegan"]) != _recipe_query_key(
+        ["rice", "vegan"]
+    )
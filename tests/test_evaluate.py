@@ -0,0 +1,21 @@
+"""
+評価 CLI (evaluate.py) のテスト
+"""
+
+from agents.base_agent import ModelProvider
+from evaluate import get_model_configs
+
+
+def test_model_configs_match_provider_by_prefix():
+    """gpt で始まるモデル名はハイフンの有無にかかわらず OpenAI として扱う"""
+    configs = get_model_configs(["gpt-4.1", "gpt4o", "gpt-4o-mini:ft-demo"])
+    assert [name for name, _ in configs] == ["gpt-4.1", "gpt4o", "gpt-4o-mini:ft-demo"]
+    assert all(
+        config.model_provider is ModelProvider.OPENAI for _, config in configs
+    )
+
+
+def test_model_configs_skip_unknown_models():
+    """対応していないモデルは設定に含めない"""
+    configs = get_model_configs(["claude-3", "gpt-4.1"])
+    assert [name for name, _ in configs] == ["gpt-4.1"]
@@ -0,0 +1,228 @@
+"""
+評価器のオフラインテスト
+バッチ評価が候補ごとの評価と一致することを確認します。
+"""
+
+import pytest
+
+from agents.nutrition_planner import (
+    DailyNutrition,
+    DietaryConstraints,
+    Inventory,
+    Meal,
+    MealPlan,
+)
+from evaluators.evaluator_manager import EvaluatorManager
+from evaluators.reward_functions.base import QualityEvaluator
+from evaluators.reward_functions.constraint import ConstraintSatisfactionEvaluator
+from evaluators.reward_functions.inventory import InventoryUtilizationEvaluator
+from evaluators.reward_functions.quality import NutritionalBalanceEvaluator
+
+INVENTORY = Inventory(
+    items=(
+        {"name": "rice", "amount_g": 500},
+        {"name": "tofu", "amount_g": 300},
+        {"name": "spinach", "amount_g": 200},
+    )
+)
+CONSTRAINTS = DietaryConstraints(
+    daily_calories=2000,
+    pfc_ratio=(20, 30, 50),
+    allergens=("nuts",),
+    dietary_restrictions=("vegetarian", "low-carb"),
+)
+
+
+def meal(name, ingredients, calories, instructions="Boil and serve"):
+    return Meal(
+        name=name,
+        ingredients=tuple(ingredients),
+        calories=calories,
+        protein_g=calories * 0.05,
+        fat_g=calories * 0.03,
+        carbs_g=calories * 0.12,
+        cooking_instructions=instructions,
+    )
+
+
+def plan(day, breakfast, lunch, dinner):
+    total = breakfast.calories + lunch.calories + dinner.calories
+    return MealPlan(
+        day=day,
+        breakfast=breakfast,
+        lunch=lunch,
+        dinner=dinner,
+        daily_nutrition=DailyNutrition(
+            total_calories=total,
+            total_protein_g=total * 0.05,
+            total_fat_g=total * 0.03,
+            total_carbs_g=total * 0.12,
+            pfc_ratio=(20.0, 30.0, 50.0),
+        ),
+        missing_ingredients=("salt",),
+    )
+
+
+# 制限キーワードが最初の食事の先頭と最後の食事の末尾にある候補
+BOUNDARY_KEYWORDS = [
+    plan(
+        1,
+        meal("Beef congee", ["rice", "beef"], 500),
+        meal("Tofu salad", ["tofu", "spinach"], 700),
+        meal("Steamed greens", ["spinach"], 800, "Steam, then serve with rice"),
+    ),
+    plan(
+        2,
+        meal("Tofu scramble", ["tofu"], 500),
+        meal("Spinach soup", ["spinach"], 300, "Simmer"),
+        meal("Rice bowl", ["rice", "tofu"], 1200),
+    ),
+]
+# 2 番目の候補だけにアレルゲン (peanut) を含む
+WITH_ALLERGEN = [
+    plan(
+        1,
+        meal("Tofu bowl", ["tofu", "spinach"], 500),
+        meal("Satay", ["tofu", "peanut sauce"], 700),
+        meal("Greens", ["spinach"], 800),
+    ),
+]
+# 食事の境界をまたいでも "peanut" や "rice" にならない
+SPLIT_KEYWORDS = [
+    plan(
+        1,
+        meal("Green pea", ["spinach"], 400, "Mash the pea"),
+        meal("Nut-free tofu", ["tofu"], 700, "Grill with ri"),
+        meal("Ce salad", ["spinach"], 900),
+    ),
+]
+CANDIDATES = [BOUNDARY_KEYWORDS, [], WITH_ALLERGEN, SPLIT_KEYWORDS]
+# 候補の順序を変えてアレルゲンを中央に置く
+ALLERGEN_IN_MIDDLE = [BOUNDARY_KEYWORDS, WITH_ALLERGEN, SPLIT_KEYWORDS]
+
+
+@pytest.mark.parametrize("batches", [CANDIDATES, ALLERGEN_IN_MIDDLE])
+def test_constraint_batch_matches_single_evaluation(batches):
+    """制約評価のバッチ結果は候補ごとの評価と一致する"""
+    evaluator = ConstraintSatisfactionEvaluator()
+    assert evaluator.evaluate_batch(batches, CONSTRAINTS, INVENTORY) == [
+        evaluator.evaluate(meal_plans, CONSTRAINTS, INVENTORY)
+        for meal_plans in batches
+    ]
+
+
+def test_constraint_batch_splits_violations_per_candidate():
+    """違反は該当する候補・日・食事にだけ割り当てられる"""
+    evaluator = ConstraintSatisfactionEvaluator()
+    results = evaluator.evaluate_batch(ALLERGEN_IN_MIDDLE, CONSTRAINTS, INVENTORY)
+    first, allergen, split = (details for _, details in results)
+
+    assert [score == 0.0 for score, _ in results] == [False, True, False]
+    assert first["violations"]["dietary_restriction_violations"] == [
+        "Vegetarian violation in breakfast on day 1",
+        "Low-carb violation in breakfast on day 1",
+        "Low-carb violation in dinner on day 1",
+        "Low-carb violation in dinner on day 2",
+    ]
+    assert allergen["violations"]["allergen_violations"] == [
+        "Allergen detected in meal plan"
+    ]
+    assert split["total_violations"] == 0
+
+
+def test_constraint_failure_check_matches_allergen_violations():
+    """バッチのクリティカル判定はアレルゲン違反の候補だけを示す"""
+    evaluator = ConstraintSatisfactionEvaluator()
+    results = evaluator.evaluate_batch_with_failure_check(
+        CANDIDATES, CONSTRAINTS, INVENTORY
+    )
+    assert [is_critical for _, _, is_critical in results] == [
+        evaluator.is_critical_failure(meal_plans, CONSTRAINTS, INVENTORY)
+        for meal_plans in CANDIDATES
+    ]
+    assert [is_critical for _, _, is_critical in results] == [
+        False,
+        False,
+        True,
+        False,
+    ]
+
+
+@pytest.mark.parametrize(
+    "evaluator",
+    [NutritionalBalanceEvaluator(), InventoryUtilizationEvaluator()],
+    ids=lambda evaluator: evaluator.name,
+)
+def test_default_batch_matches_single_evaluation(evaluator):
+    """既定のバッチ評価は候補ごとの評価と一致する"""
+    batches = [BOUNDARY_KEYWORDS, WITH_ALLERGEN, SPLIT_KEYWORDS]
+    assert evaluator.evaluate_batch(batches, CONSTRAINTS, INVENTORY) == [
+        evaluator.evaluate(meal_plans, CONSTRAINTS, INVENTORY)
+        for meal_plans in batches
+    ]
+
+
+def test_manager_batches_match_single_evaluation():
+    """評価マネージャのバッチ結果は候補ごとの評価と一致する"""
+    manager = EvaluatorManager()
+    batch = manager.evaluate_quality_scores_batch(CANDIDATES, CONSTRAINTS, INVENTORY)
+    single = [
+        manager.evaluate_quality_scores(meal_plans, CONSTRAINTS, INVENTORY)
+        for meal_plans in CANDIDATES
+    ]
+    # 空の候補の詳細には NaN が含まれ == では比較できないため repr で比べる
+    assert repr(batch) == repr(single)
+
+    # 在庫評価は空の候補を評価できないため、空でない候補で比べる
+    non_empty = [BOUNDARY_KEYWORDS, WITH_ALLERGEN, SPLIT_KEYWORDS]
+    assert manager.evaluate_mandatory_batch(non_empty, CONSTRAINTS, INVENTORY) == [
+        manager.evaluate_mandatory(meal_plans, CONSTRAINTS, INVENTORY)
+        for meal_plans in non_empty
+    ]
+
+
+class FailsOnEmptyEvaluator(QualityEvaluator):
+    """空の候補で例外を送出する評価器"""
+
+    @property
+    def name(self) -> str:
+        return "fails_on_empty"
+
+    @property
+    def description(self) -> str:
+        return "Raises for candidates without meal plans"
+
+    def evaluate(self, meal_plans, constraints, inventory):
+        if not meal_plans:
+            raise ValueError("no meal plans")
+        return 1.0, {}
+
+
+def test_quality_batch_failure_only_affects_failing_candidate():
+    """バッチ内の一候補の失敗は他の候補のスコアに影響しない"""
+    manager = EvaluatorManager()
+    manager.register_quality_evaluator(FailsOnEmptyEvaluator())
+
+    results = manager.evaluate_quality_scores_batch(
+        [BOUNDARY_KEYWORDS, []], CONSTRAINTS, INVENTORY
+    )
+    assert results[0]["individual_scores"]["fails_on_empty"] == 1.0
+    assert results[1]["individual_scores"]["fails_on_empty"] == 0.0
+    assert results[1]["details"]["fails_on_empty"] == {"error": "no meal plans"}
+
+
+def test_quality_weights_follow_manager_updates():
+    """重みの変更と評価器の登録解除が品質スコアの重み付けに反映される"""
+    manager = EvaluatorManager()
+    manager.register_quality_evaluator(FailsOnEmptyEvaluator())
+    scores = {name: 0.0 for name in manager.quality_evaluators}
+    scores["fails_on_empty"] = 1.0
+
+    manager.update_evaluator_weight("fails_on_empty", 0.0)
+    assert manager._weighted_quality_score(scores) == 0.0
+
+    for name in list(manager.quality_evaluators):
+        if name != "fails_on_empty":
+            manager.unregister_evaluator(name)
+    manager.update_evaluator_weight("fails_on_empty", 2.0)
+    assert manager._weighted_quality_score(scores) == 1.0
@@ -7,6 +7,7 @@ FatSecret API Client のテストスクリプト
 import asyncio
 import os
 
+import pytest
 from dotenv import load_dotenv
 from rich.console import Console
 from rich.panel import Panel
@@ -23,6 +24,12 @@ load_dotenv()
 console = Console()
 
 
+@pytest.fixture(autouse=True)
+def _isolated_tool_cache(disk_cache):
+    """ツール結果のキャッシュを一時ディレクトリに向ける"""
+    yield
+
+
 async def test_food_search():
     """食品検索機能のテスト"""
     console.print(Panel("[bold blue]食品検索テスト[/bold blue]"))
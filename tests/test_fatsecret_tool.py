@@ -0,0 +1,93 @@
+"""
+FatSecret ツール関数のオフラインテスト
+API 呼び出しは FatSecretClient._make_request を差し替えて再現します。
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from tools.fatsecret_tool import (
+    MIN_REQUEST_INTERVAL,
+    FatSecretAPIError,
+    FatSecretClient,
+    _wait_for_request_slot,
+    search_food_nutrition,
+)
+
+FOOD_SEARCH_RESPONSE = {"foods": {"food": [{"food_id": "1"}]}}
+FOOD_RESPONSE = {
+    "food": {
+        "food_name": "Rice",
+        "servings": {
+            "serving": {
+                "serving_description": "100 g",
+                "calories": "130",
+                "protein": "2.7",
+                "fat": "0.3",
+                "carbohydrate": "28",
+            }
+        },
+    }
+}
+
+
+@pytest.fixture(autouse=True)
+def credentials(monkeypatch):
+    monkeypatch.setenv("FATSECRET_CONSUMER_KEY", "key")
+    monkeypatch.setenv("FATSECRET_CONSUMER_SECRET", "secret")
+
+
+@pytest.fixture(autouse=True)
+def clear_memory_cache():
+    search_food_nutrition.cache_clear()
+    yield
+    search_food_nutrition.cache_clear()
+
+
+def use_api(monkeypatch, *, fail_food_get: bool) -> None:
+    """foods.search は成功させ、food.get の成否を切り替える"""
+
+    async def make_request(self, method, params):
+        if method == "foods.search":
+            return FOOD_SEARCH_RESPONSE
+        if fail_food_get:
+            raise FatSecretAPIError("HTTP Error 429: rate limited")
+        return FOOD_RESPONSE
+
+    monkeypatch.setattr(FatSecretClient, "_make_request", make_request)
+
+
+async def test_failed_lookup_is_not_cached(disk_cache, monkeypatch):
+    """失敗した検索は空の結果としてキャッシュされない"""
+    use_api(monkeypatch, fail_food_get=True)
+    with pytest.raises(FatSecretAPIError):
+        await search_food_nutrition("rice")
+
+    use_api(monkeypatch, fail_food_get=False)
+    result = await search_food_nutrition("rice")
+    assert [food["name"] for food in result["foods"]] == ["Rice"]
+
+
+async def test_successful_lookup_is_persisted(disk_cache, monkeypatch):
+    """成功した検索はディスクに保存され、API が失敗しても再利用される"""
+    use_api(monkeypatch, fail_food_get=False)
+    first = await search_food_nutrition("rice")
+
+    search_food_nutrition.cache_clear()
+    use_api(monkeypatch, fail_food_get=True)
+    assert await search_food_nutrition(" Rice ") == first
+
+
+async def test_requests_are_spaced_across_clients():
+    """クライアントが別でもリクエスト間隔を空ける"""
+    started = []
+
+    async def request():
+        await _wait_for_request_slot()
+        started.append(time.monotonic())
+
+    await asyncio.gather(*(request() for _ in range(3)))
+    gaps = [later - earlier for earlier, later in zip(started, started[1:])]
+    assert all(gap >= MIN_REQUEST_INTERVAL * 0.9 for gap in gaps)
@@ -0,0 +1,64 @@
+"""
+NutritionPlannerAgent のオフラインテスト
+"""
+
+import pytest
+from openai import AsyncOpenAI
+
+from agents.base_agent import AgentConfig, ModelProvider
+from agents.nutrition_planner import (
+    DietaryConstraints,
+    Inventory,
+    NutritionPlannerAgent,
+)
+
+INVENTORY = Inventory(
+    items=({"name": "rice", "amount_g": 500}, {"name": "egg", "amount_g": 200})
+)
+CONSTRAINTS = DietaryConstraints(
+    daily_calories=2000,
+    pfc_ratio=(30, 30, 40),
+    allergens=("nuts",),
+    dietary_restrictions=("vegetarian",),
+)
+RICE_NUTRITION = {"rice": {"match": "Rice", "calories": 130.0}}
+
+
+@pytest.fixture
+async def agent():
+    agent = NutritionPlannerAgent(
+        AgentConfig(ModelProvider.OPENAI, "gpt-4o-mini", verbose=False),
+        client=AsyncOpenAI(api_key="test"),
+    )
+    yield agent
+    await agent.aclose()
+
+
+def prefetch_returns(monkeypatch, agent, nutrition):
+    async def prefetch(inventory):
+        return nutrition
+
+    monkeypatch.setattr(agent, "_prefetch_inventory_nutrition", prefetch)
+
+
+async def test_batch_prompt_has_no_tool_instructions(agent, monkeypatch):
+    """バッチ用プロンプトはツールを指示せず、取得済みの栄養データを含む"""
+    prefetch_returns(monkeypatch, agent, RICE_NUTRITION)
+    prompt = await agent._build_batch_meal_plan_prompt(INVENTORY, CONSTRAINTS, 3)
+
+    assert prompt is not None
+    for tool_name in agent.tools:
+        assert tool_name not in prompt
+    assert "NUTRITION DATA" in prompt and '"Rice"' in prompt
+
+
+async def test_batch_skips_scenarios_without_nutrition(agent, monkeypatch):
+    """栄養データを取得できなかったシナリオはバッチに送信しない"""
+    prefetch_returns(monkeypatch, agent, {})
+
+    async def run_batch(prompts, response_format=None):
+        raise AssertionError("no request should be submitted")
+
+    monkeypatch.setattr(agent, "run_batch", run_batch)
+    scenarios = {"s1": (INVENTORY, CONSTRAINTS)}
+    assert await agent.generate_meal_plans_batch(scenarios) == {}
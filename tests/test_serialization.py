@@ -0,0 +1,53 @@
+"""
+JSON ヘルパー (utils.serialization) のテスト
+orjson の有無にかかわらず同じ出力になることを確認します。
+"""
+
+import numpy as np
+import pytest
+
+import utils.serialization
+from utils.serialization import json_dumps, json_loads
+
+DOCUMENT = {
+    "b": [1, 2.5, None, True],
+    "a": {"name": "豆腐", "nested": {"x": "y"}},
+}
+
+
+@pytest.fixture(params=["orjson", "stdlib"])
+def backend(request, monkeypatch):
+    """orjson がインストールされていない環境も再現する"""
+    if request.param == "orjson":
+        pytest.importorskip("orjson")
+    else:
+        monkeypatch.setattr(utils.serialization, "orjson", None)
+    return request.param
+
+
+def test_compact_output(backend):
+    assert json_dumps(DOCUMENT, sort_keys=True) == (
+        '{"a":{"name":"豆腐","nested":{"x":"y"}},"b":[1,2.5,null,true]}'
+    )
+
+
+def test_pretty_output(backend):
+    assert json_dumps({"a": [1]}, pretty=True) == '{\n  "a": [\n    1\n  ]\n}'
+
+
+def test_numpy_values(backend):
+    data = {
+        "int": np.int64(3),
+        "float": np.float64(0.5),
+        "array": np.array([[1, 2], [3, 4]]),
+    }
+    assert json_loads(json_dumps(data)) == {
+        "int": 3,
+        "float": 0.5,
+        "array": [[1, 2], [3, 4]],
+    }
+
+
+def test_unsupported_type_raises(backend):
+    with pytest.raises(TypeError):
+        json_dumps({"value": object()})
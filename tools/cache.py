@@ -0,0 +1,138 @@
+"""
+Persistent cache for tool results, stored in SQLite from the standard library.
+"""
+
+import functools
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+from typing import Any
+
+from utils.serialization import json_dumps, json_loads
+
+# Kept in the user cache directory so runs never write into the working tree
+_CACHE_HOME = Path(os.getenv("XDG_CACHE_HOME") or Path.home() / ".cache")
+DEFAULT_CACHE_PATH = Path(
+    os.getenv("NUTRITION_TOOL_CACHE", _CACHE_HOME / "nutrition-agent" / "tools.sqlite3")
+)
+DEFAULT_EXPIRE = 86400.0  # one day
+DEFAULT_MEMORY_SIZE = 4096
+
+
+class DiskCache:
+    """A small key-value store with per-entry expiry."""
+
+    def __init__(self, path: Path | str = DEFAULT_CACHE_PATH) -> None:
+        self.path = Path(path)
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        # Opened lazily so importing the tools never touches the filesystem
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(
+                self.path, isolation_level=None, check_same_thread=False
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            conn.execute("DELETE FROM cache WHERE expires_at < ?", (time.time(),))
+            self._conn = conn
+        return self._conn
+
+    def get(self, key: str) -> Any | None:
+        """Return the cached value, or None if missing or expired."""
+        with self._lock:
+            row = (
+                self._connect()
+                .execute(
+                    "SELECT value FROM cache WHERE key = ? AND expires_at >= ?",
+                    (key, time.time()),
+                )
+                .fetchone()
+            )
+        return None if row is None else json_loads(row[0])
+
+    def set(self, key: str, value: Any, expire: float = DEFAULT_EXPIRE) -> None:
+        """Store a JSON-serializable value for `expire` seconds."""
+        with self._lock:
+            self._connect().execute(
+                "INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, json_dumps(value), time.time() + expire),
+            )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._connect().execute("DELETE FROM cache")
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+default_cache = DiskCache()
+
+
+def disk_memoize[**P, R](
+    key_func: Callable[P, str],
+    *,
+    cache: DiskCache | None = None,
+    expire: float = DEFAULT_EXPIRE,
+    maxsize: int = DEFAULT_MEMORY_SIZE,
+) -> Callable[[Callable[P, Awaitable[R]]], Callable[P, Awaitable[R]]]:
+    """Cache an async function's results under a normalized key.
+
+    `key_func` receives the same arguments as the wrapped function and returns
+    the canonical form of the query, so equivalent calls share one entry.
+    Hits are served from an in-process LRU of `maxsize` entries first, then
+    from disk, which persists across runs. Only successful results are
+    stored, and cached values are shared, so callers must not mutate them.
+    """
+
+    def decorator(func: Callable[P, Awaitable[R]]) -> Callable[P, Awaitable[R]]:
+        prefix = f"{func.__module__}.{func.__qualname__}:"
+        # key -> (expires_at, value), most recently used last
+        memory: OrderedDict[str, tuple[float, R]] = OrderedDict()
+
+        def remember(key: str, value: R, expires_at: float) -> None:
+            memory[key] = (expires_at, value)
+            if len(memory) > maxsize:
+                memory.popitem(last=False)
+
+        @functools.wraps(func)
+        async def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
+            key = prefix + key_func(*args, **kwargs)
+            now = time.time()
+
+            entry = memory.get(key)
+            if entry is not None and entry[0] >= now:
+                memory.move_to_end(key)
+                return entry[1]
+
+            store = cache or default_cache
+            cached = store.get(key)
+            if cached is not None:
+                # The disk entry may be older; a full expiry here only delays
+                # the refresh by at most one cache lifetime
+                remember(key, cached, now + expire)
+                return cached  # type: ignore[no-any-return]
+
+            result = await func(*args, **kwargs)
+            store.set(key, result, expire)
+            remember(key, result, now + expire)
+            return result
+
+        wrapper.cache_clear = memory.clear  # type: ignore[attr-defined]
+
+        return wrapper
+
+    return decorator
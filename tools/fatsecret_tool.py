@@ -2,7 +2,6 @@ import asyncio
 import base64
 import hashlib
 import hmac
-import json
 import os
 import random
 import time
@@ -10,11 +9,32 @@ import urllib.parse
 from dataclasses import dataclass
 from typing import Any
 
-import requests
+import httpx
 from dotenv import load_dotenv
 
+from tools.cache import disk_memoize
+from utils.serialization import json_dumps, json_loads
+
 load_dotenv()
 
+REQUEST_TIMEOUT = 30.0
+
+# Minimum spacing between FatSecret requests across all clients in the
+# process; tool calls each create their own client
+MIN_REQUEST_INTERVAL = 0.1
+_next_request_time = 0.0
+
+
+async def _wait_for_request_slot() -> None:
+    """Reserve the next request slot and sleep until it starts."""
+    global _next_request_time
+    now = time.monotonic()
+    start = max(now, _next_request_time)
+    # Reserved before sleeping, so concurrent callers queue up behind it
+    _next_request_time = start + MIN_REQUEST_INTERVAL
+    if start > now:
+        await asyncio.sleep(start - now)
+
 
 @dataclass
 class NutritionInfo:
@@ -72,8 +92,23 @@ class FatSecretClient:
             )
 
         self._cache: dict[str, Any] = {}
-        self._last_request_time: float = 0
-        self._min_request_interval = 0.1  # Rate limiting
+        self._http: httpx.AsyncClient | None = None
+
+    async def __aenter__(self) -> "FatSecretClient":
+        # Share one connection pool across the requests made inside the block
+        self._http = httpx.AsyncClient(timeout=REQUEST_TIMEOUT)
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+    async def _get(self, params: dict[str, str]) -> httpx.Response:
+        if self._http is not None:
+            return await self._http.get(self.BASE_URL, params=params)
+        async with httpx.AsyncClient(timeout=REQUEST_TIMEOUT) as http:
+            return await http.get(self.BASE_URL, params=params)
 
     def _generate_oauth_signature(
         self, method: str, url: str, params: dict[str, str]
@@ -113,16 +148,13 @@ class FatSecretClient:
     async def _make_request(
         self, method: str, params: dict[str, str]
     ) -> dict[str, Any]:
-        cache_key = f"{method}:{json.dumps(params, sort_keys=True)}"
+        cache_key = f"{method}:{json_dumps(params, sort_keys=True)}"
 
         if cache_key in self._cache:
             return self._cache[cache_key]  # type: ignore[no-any-return]
 
         # Rate limiting
-        current_time = time.time()
-        time_since_last_request = current_time - self._last_request_time
-        if time_since_last_request < self._min_request_interval:
-            await asyncio.sleep(self._min_request_interval - time_since_last_request)
+        await _wait_for_request_slot()
 
         # Prepare OAuth parameters
         assert self.consumer_key is not None
@@ -147,11 +179,10 @@ class FatSecretClient:
 
         try:
             # Make GET request with all parameters
-            response = requests.get(self.BASE_URL, params=all_params)
+            response = await self._get(all_params)
             response.raise_for_status()
 
-            self._last_request_time = time.time()
-            data = response.json()
+            data = json_loads(response.content)
 
             # Check for API errors
             if "error" in data:
@@ -161,7 +192,7 @@ class FatSecretClient:
             self._cache[cache_key] = data
             return data  # type: ignore[no-any-return]
 
-        except requests.exceptions.HTTPError as e:
+        except httpx.HTTPStatusError as e:
             raise FatSecretAPIError(
                 f"HTTP Error {e.response.status_code}: {e.response.text}"
             )
@@ -185,6 +216,10 @@ class FatSecretClient:
                     food_detail = await self.get_food(food_id)
                     if food_detail:
                         foods.append(food_detail)
+                except FatSecretAPIError:
+                    # Failed requests must not look like missing results,
+                    # which the tool functions would cache
+                    raise
                 except Exception:
                     continue
 
@@ -241,6 +276,8 @@ class FatSecretClient:
                 nutrition_per_100g=nutrition_info,
             )
 
+        except FatSecretAPIError:
+            raise
         except Exception:
             return None
 
@@ -261,6 +298,10 @@ class FatSecretClient:
                     recipe_detail = await self.get_recipe(recipe_id)
                     if recipe_detail:
                         recipes.append(recipe_detail)
+                except FatSecretAPIError:
+                    # Failed requests must not look like missing results,
+                    # which the tool functions would cache
+                    raise
                 except Exception:
                     continue
 
@@ -306,6 +347,8 @@ class FatSecretClient:
                 ingredients=ingredients,
             )
 
+        except FatSecretAPIError:
+            raise
         except Exception:
             return None
 
@@ -314,10 +357,27 @@ class FatSecretClient:
 
 
 # Tool functions for agent use
+def _food_query_key(food_name: str) -> str:
+    return food_name.strip().lower()
+
+
+def _recipe_query_key(
+    ingredients: list[str], dietary_restrictions: list[str] | None = None
+) -> str:
+    # Permutations of the same ingredients share one cache entry
+    return json_dumps(
+        [
+            sorted(i.strip().lower() for i in ingredients),
+            sorted(r.strip().lower() for r in dietary_restrictions or ()),
+        ]
+    )
+
+
+@disk_memoize(_food_query_key)
 async def search_food_nutrition(food_name: str) -> dict[str, Any]:
     """Search for food items and get their nutritional information."""
-    client = FatSecretClient()
-    foods = await client.search_food(food_name, max_results=5)
+    async with FatSecretClient() as client:
+        foods = await client.search_food(food_name, max_results=5)
 
     results = []
     for food in foods:
@@ -343,18 +403,18 @@ async def search_food_nutrition(food_name: str) -> dict[str, Any]:
     return {"foods": results}
 
 
+@disk_memoize(_recipe_query_key)
 async def search_recipes_by_ingredients(
     ingredients: list[str], dietary_restrictions: list[str] | None = None
 ) -> dict[str, Any]:
     """Search for recipes based on ingredients and dietary restrictions."""
-    client = FatSecretClient()
-
     # Build search query
     query = " ".join(ingredients)
     if dietary_restrictions:
         query += " " + " ".join(dietary_restrictions)
 
-    recipes = await client.search_recipes(query, max_results=5)
+    async with FatSecretClient() as client:
+        recipes = await client.search_recipes(query, max_results=5)
 
     results = []
     for recipe in recipes:
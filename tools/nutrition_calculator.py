@@ -7,6 +7,15 @@ import numpy as np
 CAL_PER_GRAM_P = 4  # Protein provides 4 kcal/g
 CAL_PER_GRAM_F = 9  # Fat provides 9 kcal/g
 CAL_PER_GRAM_C = 4  # Carbohydrates provide 4 kcal/g
+# The same factors as a vector over [protein, fat, carbs]
+MACRO_KCAL_PER_GRAM = np.array(
+    [CAL_PER_GRAM_P, CAL_PER_GRAM_F, CAL_PER_GRAM_C], dtype=np.float64
+)
+
+
+def macro_calories(macros_g: np.ndarray) -> np.ndarray:
+    """Convert grams of [protein, fat, carbs] along the last axis to kcal."""
+    return macros_g * MACRO_KCAL_PER_GRAM
 
 
 @dataclass
@@ -227,22 +236,28 @@ def calculate_pfc_balance(
 ) -> dict[str, Any]:
     """Calculate PFC balance for a set of meals and compare to targets."""
 
-    # Convert meal data to MealNutrition objects
-    meal_nutritions = []
-    for meal in meals:
-        meal_nutritions.append(
-            MealNutrition(
-                meal_name=meal["name"],
-                calories=meal["calories"],
-                protein_g=meal["protein_g"],
-                fat_g=meal["fat_g"],
-                carbs_g=meal["carbs_g"],
-            )
+    # Sum all meals in one reduction; columns are calories, protein, fat, carbs
+    totals = (
+        np.array(
+            [
+                (meal["calories"], meal["protein_g"], meal["fat_g"], meal["carbs_g"])
+                for meal in meals
+            ],
+            dtype=np.float64,
         )
+        .reshape(-1, 4)
+        .sum(axis=0)
+    )
+    calories, protein_g, fat_g, carbs_g = totals.tolist()
+    daily_nutrition = MealNutrition(
+        meal_name="Daily total",
+        calories=calories,
+        protein_g=protein_g,
+        fat_g=fat_g,
+        carbs_g=carbs_g,
+    )
 
-    # Calculate daily totals
     calculator = NutritionCalculator()
-    daily_nutrition = calculator.calculate_daily_nutrition(meal_nutritions)
 
     # Create target
     target = NutritionTarget(daily_calories=target_calories, pfc_ratio=target_pfc)
@@ -0,0 +1,54 @@
+"""
+JSON helpers that use orjson when it is installed and fall back to the stdlib.
+"""
+
+import json
+from typing import Any
+
+import numpy as np
+
+try:
+    import orjson
+except ImportError:  # orjson is an optional speedup
+    orjson = None  # type: ignore[assignment]
+
+
+def json_loads(data: str | bytes) -> Any:
+    """Deserialize a JSON document."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _json_default(obj: Any) -> Any:
+    """Convert numpy values for the stdlib encoder, as orjson does natively."""
+    if isinstance(obj, np.generic | np.ndarray):
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def json_dumps(obj: Any, *, sort_keys: bool = False, pretty: bool = False) -> str:
+    """Serialize an object to a JSON string, compact unless `pretty` is set.
+
+    Pretty output is indented by two spaces. Both backends produce the same
+    layout.
+    """
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if pretty:
+            option |= orjson.OPT_INDENT_2
+        try:
+            return orjson.dumps(obj, option=option).decode()
+        except TypeError:
+            # e.g. integers beyond 64 bits, which the stdlib still handles
+            pass
+    return json.dumps(
+        obj,
+        sort_keys=sort_keys,
+        indent=2 if pretty else None,
+        separators=(",", ": ") if pretty else (",", ":"),
+        ensure_ascii=False,
+        default=_json_default,
+    )
@@ -0,0 +1,16 @@
+"""
+Keyword matching helpers shared by the evaluators.
+"""
+
+import re
+from collections.abc import Iterable
+
+
+def keyword_pattern(keywords: Iterable[str]) -> re.Pattern[str]:
+    """Compile a pattern that finds any of the keywords as a substring.
+
+    One search scans the text once in C instead of once per keyword in Python.
+    An empty keyword collection yields a pattern that never matches.
+    """
+    escaped = [re.escape(keyword) for keyword in sorted(keywords)]
+    return re.compile("|".join(escaped) if escaped else "(?!)")